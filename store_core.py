@@ -0,0 +1,412 @@
+from __future__ import annotations
+import json, os, re
+from array import array
+from pathlib import Path
+from store_profile import profiled
+from store_search import SearchIndex
+from store_model import StoreEntry, EntryInfo, jsonDefault
+from store_dates import tz_map, parse_date, parseTimestamp, parseTimestamps, getCurrentUTCTime
+
+ROOT_DIR = Path(os.path.realpath(__file__)).parent
+UNISTORE_FILENAME = ROOT_DIR.joinpath("stb-mc3ds.unistore")
+SPRITESHEET_FILENAME = ROOT_DIR.joinpath("assets/icons/spritesheet.t3s")
+ICONS_DIR = SPRITESHEET_FILENAME.parent
+
+_spritesheetContent: list[str] | None = None
+
+def readSpritesheet(path: Path) -> list[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f.readlines()]
+    return [line for line in lines if line != "" and not line.startswith("-")]
+
+def getSpritesheetContent() -> list[str]:
+    global _spritesheetContent
+    if _spritesheetContent == None:
+        _spritesheetContent = readSpritesheet(SPRITESHEET_FILENAME)
+    return _spritesheetContent
+
+def checkSpriteIndexes(storeInfo: dict, infos: list[dict], iconCount: int) -> list[str]:
+    sheet = storeInfo.get("sheet")
+    sheetCount = len(sheet) if isinstance(sheet, list) else 1
+
+    errors = []
+    for i, info in enumerate(infos):
+        title = info.get("title", f"entry {i}")
+        iconIndex = info.get("icon_index")
+        sheetIndex = info.get("sheet_index", 0)
+        if not isinstance(iconIndex, int) or not 0 <= iconIndex < iconCount:
+            errors.append(f"{title}: icon_index {iconIndex!r} out of range (0-{iconCount - 1})")
+        if not isinstance(sheetIndex, int) or not 0 <= sheetIndex < sheetCount:
+            errors.append(f"{title}: sheet_index {sheetIndex!r} out of range (0-{sheetCount - 1})")
+    return errors
+
+def localAssetPath(url, storeInfo: dict) -> Path | None:
+    # Screenshots and downloads point at the raw URL of this repository,
+    # those that are checked out here can be read from disk instead
+    baseUrl = storeInfo.get("url", "").rsplit("/", 1)[0] + "/"
+    if not isinstance(url, str) or baseUrl == "/" or not url.startswith(baseUrl):
+        return None
+    path = ROOT_DIR.joinpath(url[len(baseUrl):])
+    return path if path.is_file() else None
+
+JSON_DECODER = json.JSONDecoder()
+
+# Fields that can get big and aren't needed to show the grid
+LAZY_SKIPPED_FIELDS = ("releasenotes", "screenshots")
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+def skipWhitespace(text: str, pos: int) -> int:
+    return WHITESPACE.match(text, pos).end()
+
+def decodeKey(text: str, pos: int) -> tuple[str, int]:
+    # An object member name and its ':', returns where the value starts
+    key, pos = JSON_DECODER.raw_decode(text, pos)
+    if not isinstance(key, str):
+        raise ValueError(f"Expected a member name at {pos}")
+    pos = skipWhitespace(text, pos)
+    if text[pos] != ":":
+        raise ValueError(f"Expected ':' at {pos}")
+    return key, skipWhitespace(text, pos + 1)
+
+def skipSeparator(text: str, pos: int, closing: str) -> int:
+    # After a member or an element there is either a ',' and another one or
+    # the closing bracket, as strict as json.loads. Returns where the next
+    # one or the bracket is
+    pos = skipWhitespace(text, pos)
+    if text[pos] == ",":
+        pos = skipWhitespace(text, pos + 1)
+        if text[pos] != closing:
+            return pos
+    elif text[pos] == closing:
+        return pos
+    raise ValueError(f"Expected ',' or '{closing}' at {pos}")
+
+def scanStore(text: str, decodeEntry = JSON_DECODER.raw_decode) -> tuple[dict, tuple[int, int] | None, list[tuple[int, int]] | None]:
+    # Decodes the document one top-level value and one storeContent element
+    # at a time, keeping where storeInfo and every element start and end in
+    # the source text. Unchanged parts can then be written back untouched
+    # and entries can be decoded again on their own
+    content = {}
+    infoSpan = None
+    entrySpans = None
+    pos = skipWhitespace(text, 0)
+    if text[pos:pos + 1] != "{":
+        raise ValueError("Expected a JSON object")
+    pos = skipWhitespace(text, pos + 1)
+    while text[pos] != "}":
+        key, pos = decodeKey(text, pos)
+        if key == "storeContent" and text[pos] == "[":
+            entries = []
+            entrySpans = []
+            pos = skipWhitespace(text, pos + 1)
+            while text[pos] != "]":
+                entry, end = decodeEntry(text, pos)
+                entries.append(entry)
+                entrySpans.append((pos, end))
+                pos = skipSeparator(text, end, "]")
+            content[key] = entries
+            pos += 1
+        else:
+            content[key], end = JSON_DECODER.raw_decode(text, pos)
+            if key == "storeInfo":
+                infoSpan = (pos, end)
+            pos = end
+        pos = skipSeparator(text, pos, "}")
+    if skipWhitespace(text, pos + 1) != len(text):
+        raise ValueError(f"Extra data at {skipWhitespace(text, pos + 1)}")
+    return content, infoSpan, entrySpans
+
+def decodeSummary(text: str, pos: int) -> tuple[dict, int]:
+    # decodeEntry for lazy loading: the info without LAZY_SKIPPED_FIELDS and
+    # the script names. Every member is still decoded, the C decoder is the
+    # fastest way to skip one, but each is dropped right away so the whole
+    # entry never exists at once
+    entry = {}
+    if text[pos] != "{":
+        raise ValueError(f"Expected an entry object at {pos}")
+    pos = skipWhitespace(text, pos + 1)
+    while text[pos] != "}":
+        key, pos = decodeKey(text, pos)
+        value, pos = JSON_DECODER.raw_decode(text, pos)
+        if key == "info" and isinstance(value, dict):
+            value = {field: fieldValue for field, fieldValue in value.items() if not field in LAZY_SKIPPED_FIELDS}
+        entry[key] = value if key == "info" else None
+        pos = skipSeparator(text, pos, "}")
+    return entry, pos + 1
+
+def dumpIndented(obj, level: int, newline: str = "\n") -> str:
+    return json.dumps(obj, indent=4, default=jsonDefault).replace("\n", newline + " " * (4 * level))
+
+def fileMode(path: Path) -> int:
+    # The mode the file has, or what the umask gives a new one
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def writeFileAtomic(path: Path, text: str):
+    # tempfile pulls in shutil and random, only pay for it when saving
+    import tempfile
+    mode = fileMode(path)
+    fd, tmpPath = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            # mkstemp creates it as 0600
+            os.chmod(f.fileno() if os.chmod in os.supports_fd else tmpPath, mode)
+            os.fsync(f.fileno())
+        os.replace(tmpPath, path)
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+    # Makes the rename itself durable, directories can't be opened on Windows
+    if hasattr(os, "O_DIRECTORY"):
+        dirFd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dirFd)
+        finally:
+            os.close(dirFd)
+
+def decodeEntry(entry):
+    if isinstance(entry, dict):
+        return StoreEntry.fromJson(entry)
+    return entry
+
+def entryIdentity(entry) -> tuple:
+    # What an entry is recognized by across reloads: its title and the
+    # names of its scripts
+    if not isinstance(entry, (dict, StoreEntry)):
+        return (None, ())
+    info = entry.get("info")
+    title = info.get("title") if isinstance(info, (dict, EntryInfo)) else None
+    return (title, tuple(key for key in entry if key != "info"))
+
+class StoreContent:
+    @profiled("StoreContent load")
+    def __init__(self, path: Path, lazy: bool = False):
+        self.path = path
+        self.lazy = lazy
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            self.parse(f.read())
+
+    def parse(self, text: str):
+        path = self.path
+        lazy = self.lazy
+
+        # Everything is built first and only replaced once nothing can fail,
+        # a file that doesn't load leaves the previous state untouched
+        try:
+            json_content, infoSpan, entrySpans = scanStore(text, decodeSummary if lazy else JSON_DECODER.raw_decode)
+        except (ValueError, IndexError):
+            json_content = json.loads(text)
+            infoSpan, entrySpans = None, None
+
+        # In lazy mode entries stay as None until getEntry() decodes them
+        # from their span, only the summary decodeSummary() made is kept
+        entrySummaries: list[dict | None] = []
+        entryIdentities: list[tuple] = []
+        if lazy and entrySpans != None:
+            for entry in json_content["storeContent"]:
+                entrySummaries.append(entry["info"])
+                entryIdentities.append(entryIdentity(entry))
+            json_content["storeContent"] = [None] * len(entrySpans)
+
+        if not ("storeInfo" in json_content):
+            print("File does not contain 'storeInfo'")
+            print("Creating template...")
+            json_content["storeInfo"] = {}
+            json_content["storeInfo"]["title"] = "dummyTitle"
+            json_content["storeInfo"]["author"] = "dummy"
+            json_content["storeInfo"]["description"] = "dummyDescription"
+            json_content["storeInfo"]["file"] = path.name
+            json_content["storeInfo"]["url"] = "dummyUrl.com"
+            json_content["storeInfo"]["sheet"] = "dummySheet.t3x"
+            json_content["storeInfo"]["sheetURL"] = "dummySheetUrl.com"
+            json_content["storeInfo"]["version"] = 3
+            json_content["storeInfo"]["revision"] = 1
+            print("Check later the file to replace info about unistore")
+        if not ("storeContent" in json_content):
+            json_content["storeContent"] = []
+        else:
+            if type(json_content["storeContent"]) != list:
+                json_content["storeContent"] = []
+
+        storeContent = [decodeEntry(entry) for entry in json_content["storeContent"]]
+        if len(entrySummaries) != len(storeContent):
+            entrySummaries = [None] * len(storeContent)
+        if len(entryIdentities) != len(storeContent):
+            entryIdentities = [entryIdentity(entry) for entry in storeContent]
+
+        infos = [entrySummaries[idx] if entry == None else entry["info"] for idx, entry in enumerate(storeContent)]
+        sortKeys = [self.makeSortKeys(info) for info in infos]
+        searchIndex = SearchIndex()
+        for idx, info in enumerate(infos):
+            searchIndex.add(idx, info)
+
+        self.sourceText = text
+        self.infoSpan, self.entrySpans = infoSpan, entrySpans
+        self.storeInfo: dict = json_content["storeInfo"]
+        self.storeContent: list[StoreEntry | None] = storeContent
+        self.entrySummaries: list[dict | None] = entrySummaries
+        self.entryIdentities: list[tuple] = entryIdentities
+        self.sortKeys: list[dict | None] = sortKeys
+        self.searchIndex = searchIndex
+        self.dirtyEntries: set[int] = set()
+        self.infoDirty = False
+
+    @profiled("StoreContent.reload")
+    def reload(self) -> tuple[dict[int, int], set[int]] | None:
+        # Reads the file again, None when its text didn't change. Otherwise
+        # returns old index -> new index of the entries found again by their
+        # identity, and the new indexes whose content is new or differs.
+        # Unchanged entries keep their objects, so open editors stay valid
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        if text == self.sourceText:
+            return None
+
+        oldText, oldSpans, oldEntries, oldDirty = self.sourceText, self.entrySpans, self.storeContent, self.dirtyEntries
+        candidates: dict[tuple, list[int]] = {}
+        for idx in range(len(oldEntries)):
+            candidates.setdefault(self.getIdentity(idx), []).append(idx)
+        self.parse(text)
+
+        remap = {}
+        changed = set()
+        for idx in range(len(self.storeContent)):
+            matches = candidates.get(self.entryIdentities[idx])
+            if not matches:
+                changed.add(idx)
+                continue
+            oldIdx = matches.pop(0)
+            remap[oldIdx] = idx
+            # Unsaved edits are dropped, those entries count as changed
+            if oldSpans == None or self.entrySpans == None or oldIdx in oldDirty:
+                changed.add(idx)
+                continue
+            oldSource, newSource = oldText[slice(*oldSpans[oldIdx])], text[slice(*self.entrySpans[idx])]
+            # Only reformatted is not a change
+            if oldSource != newSource and json.loads(oldSource) != json.loads(newSource):
+                changed.add(idx)
+            elif oldEntries[oldIdx] != None:
+                self.storeContent[idx] = oldEntries[oldIdx]
+                self.entrySummaries[idx] = None
+        return remap, changed
+
+    def getIdentity(self, idx: int) -> tuple:
+        # Decoded entries may have been renamed since they were loaded
+        entry = self.storeContent[idx]
+        return self.entryIdentities[idx] if entry == None else entryIdentity(entry)
+
+    def getEntry(self, idx: int) -> StoreEntry:
+        entry = self.storeContent[idx]
+        if entry == None:
+            start, end = self.entrySpans[idx]
+            entry = self.storeContent[idx] = decodeEntry(json.loads(self.sourceText[start:end]))
+            self.entrySummaries[idx] = None
+        return entry
+
+    def getInfo(self, idx: int) -> EntryInfo | dict:
+        entry = self.storeContent[idx]
+        if entry == None:
+            return self.entrySummaries[idx]
+        return entry["info"]
+
+    def loadAll(self):
+        for idx in range(len(self.storeContent)):
+            self.getEntry(idx)
+
+    def markDirty(self, idx: int | None = None):
+        if idx == None:
+            self.infoDirty = True
+        else:
+            self.dirtyEntries.add(idx)
+
+    def isDirty(self) -> bool:
+        return self.infoDirty or len(self.dirtyEntries) > 0
+
+    def serialize(self) -> str:
+        newline = "\r\n" if "\r\n" in self.sourceText else "\n"
+        canSplice = self.infoSpan != None and self.entrySpans != None and len(self.entrySpans) == len(self.storeContent)
+        if not canSplice:
+            self.loadAll()
+            return dumpIndented({"storeInfo": self.storeInfo, "storeContent": self.storeContent}, 0, newline) + newline
+
+        # Only storeInfo and the dirty entries are dumped again, everything
+        # else is copied from the source text as it was
+        replacements = [(self.infoSpan, dumpIndented(self.storeInfo, 1, newline))]
+        for idx in self.dirtyEntries:
+            replacements.append((self.entrySpans[idx], dumpIndented(self.storeContent[idx], 2, newline)))
+        replacements.sort()
+
+        pieces = []
+        last = 0
+        for (start, end), value in replacements:
+            pieces.append(self.sourceText[last:start])
+            pieces.append(value)
+            last = end
+        pieces.append(self.sourceText[last:])
+        return "".join(pieces)
+
+    @profiled("StoreContent.save")
+    def save(self, path: Path | None = None) -> bool:
+        if not self.isDirty():
+            return False
+        path = self.path if path == None else path
+
+        self.storeInfo["revision"] = self.storeInfo.get("revision", 0) + 1
+        text = self.serialize()
+        writeFileAtomic(path, text)
+
+        self.path = path
+        self.sourceText = text
+        _, self.infoSpan, self.entrySpans = scanStore(text)
+        self.dirtyEntries.clear()
+        self.infoDirty = False
+        return True
+
+    @profiled("StoreContent.buildSortKeys")
+    def buildSortKeys(self):
+        self.sortKeys = [self.makeSortKeys(self.getInfo(idx)) for idx in range(len(self.storeContent))]
+
+    def makeSortKeys(self, info: dict) -> dict:
+        title = info["title"].lower()
+        return {
+            "date": parseTimestamp(info["last_updated"]),
+            "title": title,
+            "category": (tuple(category.lower() for category in info["category"]), title)
+        }
+
+    def getSortKeys(self, idx: int) -> dict:
+        if len(self.sortKeys) != len(self.storeContent):
+            self.buildSortKeys()
+        keys = self.sortKeys[idx]
+        if keys == None:
+            keys = self.sortKeys[idx] = self.makeSortKeys(self.getInfo(idx))
+        return keys
+
+    def getTimestamps(self) -> array:
+        return parseTimestamps(self.getInfo(idx)["last_updated"] for idx in range(len(self.storeContent)))
+
+    def entryInfoChanged(self, idx: int):
+        if idx < len(self.sortKeys):
+            self.sortKeys[idx] = None
+        self.searchIndex.update(idx, self.getInfo(idx))
+
+    @profiled("StoreContent.search")
+    def search(self, query: str) -> set[int] | None:
+        return self.searchIndex.search(query)
+
+    def sortedIndexes(self, by: str = "date", reverse: bool | None = None, subset: set[int] | None = None) -> list[int]:
+        if not by in ("date", "title", "category"):
+            raise ValueError(f"Invalid sort key {by}")
+        if reverse == None:
+            # Newest entries first, alphabetical otherwise
+            reverse = by == "date"
+        indexes = range(len(self.storeContent)) if subset == None else subset
+        return sorted(indexes, key=lambda i : self.getSortKeys(i)[by], reverse=reverse)
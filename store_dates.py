@@ -0,0 +1,98 @@
+from __future__ import annotations
+import re
+from array import array
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from typing import Iterable
+from store_profile import profiled
+
+# Timestamps in the unistore look like "2024-12-20 at 0:00 (UTC)"
+
+tz_map = {
+    "(CST)": timezone(timedelta(hours=-6)),
+    "(CDT)": timezone(timedelta(hours=-5)),
+    "(UTC)": timezone.utc
+}
+TZ_OFFSETS = {abbr: int(tz.utcoffset(None).total_seconds()) for abbr, tz in tz_map.items()}
+
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Digits only, as strptime's %Y-%m-%d and %H:%M take them. int() alone
+# would also take signs, spaces and underscores
+DATE_PATTERN = re.compile(r"([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})")
+TIME_PATTERN = re.compile(r"([0-9]{1,2}):([0-9]{1,2})")
+
+def daysFromCivil(year: int, month: int, day: int) -> int:
+    # Days since 1970-01-01 in the proleptic Gregorian calendar
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+# Only cache misses end up in the profile
+@lru_cache(maxsize=65536)
+@profiled("parseTimestamp")
+def parseTimestamp(date_str: str) -> int:
+    parts = date_str.split()
+    if len(parts) != 4 or parts[1] != "at":
+        raise ValueError(f"Invalid date format: {date_str!r}")
+    date, _, time, tz_abbr = parts
+    if not tz_abbr in TZ_OFFSETS:
+        raise ValueError(f"Unknown timezone: {tz_abbr}")
+
+    dateMatch = DATE_PATTERN.fullmatch(date)
+    timeMatch = TIME_PATTERN.fullmatch(time)
+    if dateMatch == None or timeMatch == None:
+        raise ValueError(f"Invalid date format: {date_str!r}")
+    year, month, day = map(int, dateMatch.groups())
+    hour, minute = map(int, timeMatch.groups())
+
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if not (1 <= month <= 12 and 1 <= day <= DAYS_IN_MONTH[month - 1] + leap and 0 <= hour <= 23 and 0 <= minute <= 59):
+        raise ValueError(f"Invalid date: {date_str!r}")
+
+    return daysFromCivil(year, month, day) * 86400 + hour * 3600 + minute * 60 - TZ_OFFSETS[tz_abbr]
+
+def parseTimestamps(date_strs: Iterable[str]) -> array:
+    return array("q", map(parseTimestamp, date_strs))
+
+def parse_date(date_str: str) -> datetime:
+    return datetime.fromtimestamp(parseTimestamp(date_str), tz_map[date_str.rsplit(None, 1)[-1]])
+
+def getCurrentUTCTime() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d at %H:%M (UTC)")
+
+def legacyParseDate(date_str: str) -> datetime:
+    *dt_parts, tz_abbr = date_str.split()
+    dt = datetime.strptime(" ".join(dt_parts), "%Y-%m-%d at %H:%M")
+    if tz_abbr in tz_map:
+        return dt.replace(tzinfo=tz_map[tz_abbr])
+    raise ValueError(f"Unknown timezone: {tz_abbr}")
+
+def benchmark(count: int = 10000, rounds: int = 5):
+    import random, timeit
+
+    rng = random.Random(0)
+    samples = [f"20{rng.randint(10, 30)}-{rng.randint(1, 12):02}-{rng.randint(1, 28):02} at {rng.randint(0, 23)}:{rng.randint(0, 59):02} {rng.choice(list(tz_map))}" for _ in range(count)]
+    for sample in samples:
+        assert legacyParseDate(sample) == parse_date(sample)
+
+    def bestOf(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=rounds))
+
+    def cold():
+        parseTimestamp.cache_clear()
+        parseTimestamps(samples)
+
+    legacy = bestOf(lambda : [legacyParseDate(sample) for sample in samples])
+    results = {
+        "strptime parse_date": legacy,
+        "parseTimestamp (cold cache)": bestOf(cold),
+        "parseTimestamps (warm cache)": bestOf(lambda : parseTimestamps(samples)),
+    }
+    for name, seconds in results.items():
+        print(f"{name:30} {seconds * 1000:8.2f} ms  {legacy / seconds:6.1f}x")
+
+if __name__ == "__main__":
+    benchmark()
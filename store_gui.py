@@ -1,5 +1,7 @@
 from __future__ import annotations
-import json, sys
+import os, sys, queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import tkinter
 import tkinter.filedialog
 import tkinter.messagebox
@@ -7,45 +9,200 @@ import tkinter.ttk
 from pathlib import Path
 import customtkinter
 from PIL import Image
-from datetime import datetime, timezone, timedelta
-from dateutil import parser
-import pytz
-
-UNISTORE_FILENAME = "./stb-mc3ds.unistore"
-SPRITESHEET_FILENAME = "./assets/icons/spritesheet.t3s"
-ICONS_DIR = Path(SPRITESHEET_FILENAME).parent
-
-SPRITESHEET_CONTENT = []
-with open(SPRITESHEET_FILENAME, "r") as f:
-    SPRITESHEET_CONTENT = f.readlines()[2:]
-for i, element in enumerate(SPRITESHEET_CONTENT):
-    SPRITESHEET_CONTENT[i] = element[:-1] if element.endswith("\n") else element
-
-tz_map = {
-    "(CST)": timezone(timedelta(hours=-6)),
-    "(CDT)": timezone(timedelta(hours=-5)),
-    "(UTC)": timezone.utc
-}
-
-def parse_date(date_str: str):
-    *dt_parts, tz_abbr = date_str.split()
-    dt_str = " ".join(dt_parts)
-    
-    dt = datetime.strptime(dt_str, "%Y-%m-%d at %H:%M")
-
-    if tz_abbr in tz_map:
-        dt = dt.replace(tzinfo=tz_map[tz_abbr])
-    else:
-        raise ValueError(f"Unknown timezone: {tz_abbr}")
-    return dt
-
-def getCurrentUTCTime() -> str:
-    utc = pytz.utc
-    utc_time = datetime.now(utc)
-    futc_time = str(utc_time).split(".")[0]
-    futc_time = futc_time.split(" ")
-    futc_time = f"{futc_time[0]} at {futc_time[1][:-3]} (UTC)"
-    return futc_time
+if __name__ == "__main__":
+    # Only the editor takes --profile, set before store_profile is imported
+    for arg in sys.argv[1:]:
+        if arg == "--profile" and not os.environ.get("UNISTORE_PROFILE"):
+            os.environ["UNISTORE_PROFILE"] = "1"
+        elif arg.startswith("--profile="):
+            os.environ["UNISTORE_PROFILE"] = arg.split("=", 1)[1]
+from store_profile import profiled, watchEventLoop, addCounters
+from store_core import UNISTORE_FILENAME, ICONS_DIR, StoreContent, getSpritesheetContent, localAssetPath
+from store_model import BLOCK_SCHEMA, newBlock
+
+GRID_COLUMNS = 4
+GRID_TILE_HEIGHT = 150
+VIRTUAL_GRID_THRESHOLD = 64
+ICON_SIZE = (80, 80)
+SCREENSHOT_SIZE = (160, 120)
+
+@profiled("decodeIcon")
+def decodeIcon(iconIndex: int, size: tuple[int, int]) -> Image.Image:
+    with Image.open(ICONS_DIR.joinpath(getSpritesheetContent()[iconIndex])) as image:
+        return image.convert("RGBA").resize(size, Image.Resampling.LANCZOS)
+
+@profiled("decodeScreenshot")
+def decodeScreenshot(path: Path, size: tuple[int, int]) -> Image.Image:
+    # Fits the screenshot in size, keeping its aspect ratio
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+        image.thumbnail(size, Image.Resampling.LANCZOS)
+        return image
+
+_placeholders: dict[tuple[int, int], customtkinter.CTkImage] = {}
+
+def placeholderImage(size: tuple[int, int]) -> customtkinter.CTkImage:
+    # Shown until the real image is decoded, so tiles don't change size
+    placeholder = _placeholders.get(size)
+    if placeholder == None:
+        placeholder = _placeholders[size] = customtkinter.CTkImage(Image.new("RGBA", size, (0, 0, 0, 0)), size=size)
+    return placeholder
+
+class ImageLoader:
+    # Decodes images on a thread pool. Finished images are handed back to the
+    # Tk thread in batches from an after() poll that only runs while there
+    # is work, callbacks never run on a worker. Requests for an image that
+    # is already being decoded share the result
+    def __init__(self, workers: int = min(4, os.cpu_count() or 1), batchSize: int = 32, intervalMs: int = 15):
+        self.workers = workers
+        self.batchSize = batchSize
+        self.intervalMs = intervalMs
+        self.executor = None
+        self.results = queue.SimpleQueue()
+        self.callbacks: dict[tuple, list] = {}
+        self.root = None
+        self.afterId = None
+
+    def request(self, widget: tkinter.Misc, key: tuple, decode, callback) -> bool:
+        # True when a decode was started, False when it joined one in flight
+        callbacks = self.callbacks.get(key)
+        if callbacks != None:
+            callbacks.append(callback)
+            return False
+        self.callbacks[key] = [callback]
+        if self.executor == None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image")
+        if self.root == None:
+            self.root = widget._root()
+        self.executor.submit(self.work, key, decode)
+        if self.afterId == None:
+            self.afterId = self.root.after(self.intervalMs, self.drain)
+        return True
+
+    def work(self, key: tuple, decode):
+        try:
+            image = decode()
+        except Exception as e:
+            print(f"Could not load image {key}: {e}", file=sys.stderr)
+            image = None
+        self.results.put((key, image))
+
+    @profiled("ImageLoader.drain")
+    def drain(self):
+        self.afterId = None
+        for _ in range(self.batchSize):
+            try:
+                key, image = self.results.get_nowait()
+            except queue.Empty:
+                break
+            for callback in self.callbacks.pop(key, []):
+                callback(image)
+        if self.callbacks:
+            try:
+                self.afterId = self.root.after(self.intervalMs, self.drain)
+            except tkinter.TclError:
+                pass
+
+IMAGE_LOADER = ImageLoader()
+
+class IconCache:
+    def __init__(self, maxBytes: int = 8 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.usedBytes = 0
+        self.icons: OrderedDict[tuple, tuple[customtkinter.CTkImage, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Requests that waited for a decode another tile already started
+        self.joined = 0
+
+    def lookup(self, key: tuple) -> customtkinter.CTkImage | None:
+        cached = self.icons.get(key)
+        if cached == None:
+            return None
+        self.icons.move_to_end(key)
+        self.hits += 1
+        return cached[0]
+
+    def store(self, key: tuple, image: Image.Image) -> customtkinter.CTkImage:
+        size = key[1]
+        icon = customtkinter.CTkImage(image, size=size)
+        iconBytes = size[0] * size[1] * 4
+
+        while self.icons and self.usedBytes + iconBytes > self.maxBytes:
+            _, (_, evictedBytes) = self.icons.popitem(last=False)
+            self.usedBytes -= evictedBytes
+        self.icons[key] = (icon, iconBytes)
+        self.usedBytes += iconBytes
+        return icon
+
+    def get(self, iconIndex: int, size: tuple[int, int]) -> customtkinter.CTkImage:
+        key = (iconIndex, size)
+        icon = self.lookup(key)
+        if icon == None:
+            self.misses += 1
+            icon = self.store(key, decodeIcon(iconIndex, size))
+        return icon
+
+    def request(self, widget: tkinter.Misc, iconIndex: int, size: tuple[int, int], callback) -> customtkinter.CTkImage | None:
+        # Cached icons are returned right away, otherwise the icon is decoded
+        # in the background and callback(icon) runs later on the Tk thread
+        key = (iconIndex, size)
+        icon = self.lookup(key)
+        if icon != None:
+            return icon
+        if IMAGE_LOADER.request(widget, ("icon",) + key, lambda : decodeIcon(iconIndex, size), lambda image : self.loaded(key, image, callback)):
+            self.misses += 1
+        else:
+            self.joined += 1
+        return None
+
+    def loaded(self, key: tuple, image: Image.Image | None, callback):
+        if image == None:
+            return
+        icon = self.icons[key][0] if key in self.icons else self.store(key, image)
+        callback(icon)
+
+    def clear(self):
+        self.icons.clear()
+        self.usedBytes = 0
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "joined": self.joined, "entries": len(self.icons), "bytes": self.usedBytes}
+
+ICON_CACHE = IconCache()
+addCounters("icon cache", ICON_CACHE.stats)
+
+class FileWatcher:
+    # Polls the size and mtime of a file from the Tk loop and calls callback
+    # when they change, no thread or file system service involved
+    def __init__(self, widget: tkinter.Misc, path: Path, callback, intervalMs: int = 1000):
+        self.widget = widget
+        self.path = path
+        self.callback = callback
+        self.intervalMs = intervalMs
+        self.signature = self.stat()
+        self.afterId = widget.after(intervalMs, self.poll)
+
+    def stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        signature = self.stat()
+        # Missing means it's being replaced, the next poll sees the new file.
+        # A callback that fails doesn't stop the polling
+        try:
+            if signature != None and signature != self.signature:
+                self.signature = signature
+                self.callback()
+        finally:
+            self.afterId = self.widget.after(self.intervalMs, self.poll)
+
+    def stop(self):
+        self.widget.after_cancel(self.afterId)
 
 class ToolTip:
     def __init__(self, widget, text, delay=1000):
@@ -111,34 +268,6 @@ class ModalWindow(tkinter.Toplevel):
         y = (theight // 2) - (height // 2)
         self.geometry(f"{width}x{height}+{x}+{y}")
 
-class StoreContent:
-    def __init__(self, path: Path):
-        with open(path, "r", encoding="utf-8") as f:
-            json_content = json.loads(f.read())
-
-        if not ("storeInfo" in json_content):
-            print("File does not contain 'storeInfo'")
-            print("Creating template...")
-            json_content["storeInfo"] = {}
-            json_content["storeInfo"]["title"] = "dummyTitle"
-            json_content["storeInfo"]["author"] = "dummy"
-            json_content["storeInfo"]["description"] = "dummyDescription"
-            json_content["storeInfo"]["file"] = path.name
-            json_content["storeInfo"]["url"] = "dummyUrl.com"
-            json_content["storeInfo"]["sheet"] = "dummySheet.t3x"
-            json_content["storeInfo"]["sheetURL"] = "dummySheetUrl.com"
-            json_content["storeInfo"]["version"] = 3
-            json_content["storeInfo"]["revision"] = 1
-            print("Check later the file to replace info about unistore")
-        if not ("storeContent" in json_content):
-            json_content["storeContent"] = []
-        else:
-            if type(json_content["storeContent"]) != list:
-                json_content["storeContent"] = []
-
-        self.storeInfo: dict = json_content["storeInfo"]
-        self.storeContent: list[dict] = json_content["storeContent"]
-
 class SelectNewBlockTypeWindow(ModalWindow):
     def __init__(self, master, closeCommand=None):
         super().__init__(master, "Select block type")
@@ -150,10 +279,7 @@ class SelectNewBlockTypeWindow(ModalWindow):
         mainframe = customtkinter.CTkFrame(self, corner_radius=0)
         mainframe.grid(column=0, row=0, sticky="wnes")
 
-        btnTypes = ["downloadFile", "downloadRelease", "extractFile", "installCia",
-                    "bootTitle", "mkdir", "rmdir", "move", "copy", "deleteFile",
-                    "promptMessage", "skip", "exit"]
-        for i, element in enumerate(btnTypes):
+        for i, element in enumerate(BLOCK_SCHEMA):
             btn = customtkinter.CTkButton(mainframe, text=element, width=150, command= lambda a=element : self.blockTypeSelection(a))
             btn.grid(column=i % 5, row=i//5, padx=(2, 0), pady=(2, 0))
         
@@ -168,12 +294,88 @@ class SelectNewBlockTypeWindow(ModalWindow):
         if self.closeCommand != None:
             self.closeCommand()
 
+class FieldBinder:
+    # Writes edited fields back into the loaded JSON. Every field is bound to
+    # the dict (and key) it came from, writes only schedule a flush, so a
+    # burst of keystrokes ends up as one batch applied to the model
+    def __init__(self, widget, onCommit = None, delay: int = 300):
+        self.widget = widget
+        self.onCommit = onCommit
+        self.delay = delay
+        self.afterId = None
+        self.fields: list[tuple] = []
+        self.pendingTextboxes = set()
+
+    def bindVar(self, var: tkinter.Variable, container: dict, key: str, default = None):
+        # default is what the field shows when the key is missing, it only
+        # gets written once it's changed
+        self.fields.append((var.get, container, key, default))
+        var.trace_add("write", self.schedule)
+
+    def bindTextbox(self, textbox: customtkinter.CTkTextbox, container: dict, key: str):
+        # <<Modified>> fires once until the flag is reset, so further typing
+        # doesn't reach Python until the next flush
+        text = textbox._textbox
+        self.fields.append((lambda : text.get("1.0", "end-1c"), container, key, None))
+        text.edit_modified(False)
+        text.bind("<<Modified>>", lambda event : self.textboxModified(text), add="+")
+
+    def unbind(self, container: dict):
+        # Forgets the fields of a container whose widgets are gone
+        self.fields = [field for field in self.fields if not field[1] is container]
+
+    def textboxModified(self, text: tkinter.Text):
+        if text.edit_modified() and not text in self.pendingTextboxes:
+            self.pendingTextboxes.add(text)
+            self.schedule()
+
+    def schedule(self, *args):
+        if self.afterId != None:
+            self.widget.after_cancel(self.afterId)
+        self.afterId = self.widget.after(self.delay, self.flush)
+
+    @profiled("FieldBinder.flush")
+    def flush(self):
+        if self.afterId != None:
+            self.widget.after_cancel(self.afterId)
+            self.afterId = None
+        for text in self.pendingTextboxes:
+            text.edit_modified(False)
+        self.pendingTextboxes.clear()
+
+        changed = False
+        for getter, container, key, default in self.fields:
+            try:
+                value = getter()
+            except tkinter.TclError:
+                continue
+            old = container.get(key, default)
+            # Counts are stored as numbers, keep them that way while they parse
+            if isinstance(old, int) and not isinstance(old, bool) and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+                value = int(value)
+            if old != value or type(old) != type(value):
+                container[key] = value
+                changed = True
+        if changed and self.onCommit != None:
+            self.onCommit()
+        return changed
+
+def flushPendingEdits(widget: tkinter.Misc):
+    # Applies edits still waiting for their debounce in widget and any window
+    # or frame below it, before saving or closing
+    binder = getattr(widget, "binder", None)
+    if isinstance(binder, FieldBinder):
+        binder.flush()
+    for child in widget.winfo_children():
+        flushPendingEdits(child)
+
 class ScriptViewFrame(customtkinter.CTkFrame):
-    def __init__(self, master, elementData: dict, elementName: str, **kwargs):
+    def __init__(self, master, elementData: dict, elementName: str, changeCommand = None, **kwargs):
         super().__init__(master, **kwargs)
         self.columnconfigure(0, weight=1)
 
         self.elementData = elementData
+        self.changeCommand = changeCommand
 
         self.lastElementName = elementName
         self.elementNameVar = customtkinter.StringVar(self, value=elementName)
@@ -188,7 +390,9 @@ class ScriptViewFrame(customtkinter.CTkFrame):
         self.selectBlockWindow = None
         self.scriptBlocksFrame = None
         self.toggle = False
-        self.blocks = []
+        self.blocks: list[ScriptBlock] = []
+        self.addBlockBtns: list[customtkinter.CTkButton] = []
+        self.binder = FieldBinder(self, self.notifyChange)
 
     def checkNameAndUpdate(self, event=None):
         if self.lastElementName != self.elementNameVar.get():
@@ -200,6 +404,11 @@ class ScriptViewFrame(customtkinter.CTkFrame):
             self.elementData[self.elementNameVar.get()] = self.elementData[self.lastElementName]
             del self.elementData[self.lastElementName]
             self.lastElementName = self.elementNameVar.get()
+            self.notifyChange()
+
+    def notifyChange(self):
+        if self.changeCommand != None:
+            self.changeCommand()
 
     def createBlocksFrame(self):
         if self.scriptBlocksFrame == None:
@@ -212,35 +421,63 @@ class ScriptViewFrame(customtkinter.CTkFrame):
         if self.toggle:
             self.toggleViewBtn.configure(text="↓")
             if self.scriptBlocksFrame != None:
-                self.scriptBlocksFrame.destroy()
-                self.scriptBlocksFrame = None
+                self.scriptBlocksFrame.grid_remove()
         else:
             self.toggleViewBtn.configure(text="↑")
-            self.createBlocksFrame()
-            self.loadBlocks()
+            if self.scriptBlocksFrame == None:
+                self.createBlocksFrame()
+                self.loadBlocks()
+            else:
+                self.scriptBlocksFrame.grid()
         self.toggle = not self.toggle
 
-    def reloadBlocks(self):
-        if self.scriptBlocksFrame != None:
-            self.scriptBlocksFrame.destroy()
-            self.scriptBlocksFrame = None
-            self.createBlocksFrame()
-            self.loadBlocks()
-
+    @profiled("ScriptViewFrame.loadBlocks")
     def loadBlocks(self):
         self.blocks.clear()
+        self.addBlockBtns.clear()
         if self.scriptBlocksFrame != None:
             for i in range(len(self.elementData[self.lastElementName])):
-                addBlockBtn = customtkinter.CTkButton(self.scriptBlocksFrame, text="+", command=lambda a=i : self.addBlockCallback(a), width=20, height=10, corner_radius=360, fg_color="transparent", border_width=0)
-                addBlockBtn.grid(column=1, row=i*2)
-                ToolTip(addBlockBtn, "Add block")
-                block = ScriptBlock(self.scriptBlocksFrame, self.elementData[self.lastElementName], i, self.reloadBlocks)
-                block.grid(column=0, row=i*2+1, sticky="wnes", padx=(10, 0))
-                self.blocks.append(block)
-            i = len(self.elementData[self.lastElementName])
-            addBlockBtn = customtkinter.CTkButton(self.scriptBlocksFrame, text="+", command=lambda a=i : self.addBlockCallback(a), width=20, height=10, corner_radius=10, fg_color="transparent", border_width=0)
-            addBlockBtn.grid(column=1, row=i*2)
-            ToolTip(addBlockBtn, "Add block")
+                self.addBlockBtns.append(self.newAddBlockButton(i))
+                self.blocks.append(self.newBlock(i))
+            self.addBlockBtns.append(self.newAddBlockButton(len(self.blocks)))
+
+    def newAddBlockButton(self, idx: int):
+        addBlockBtn = customtkinter.CTkButton(self.scriptBlocksFrame, text="+", command=lambda a=idx : self.addBlockCallback(a), width=20, height=10, corner_radius=360, fg_color="transparent", border_width=0)
+        addBlockBtn.grid(column=1, row=idx*2)
+        ToolTip(addBlockBtn, "Add block")
+        return addBlockBtn
+
+    def newBlock(self, idx: int):
+        block = ScriptBlock(self.scriptBlocksFrame, self.elementData[self.lastElementName], idx, self.removeBlock, self.binder)
+        block.grid(column=0, row=idx*2+1, sticky="wnes", padx=(10, 0))
+        return block
+
+    def regridBlocks(self, start: int):
+        for i in range(start, len(self.blocks)):
+            self.blocks[i].key = i
+            self.blocks[i].grid(row=i*2+1)
+        for i in range(start, len(self.addBlockBtns)):
+            self.addBlockBtns[i].configure(command=lambda a=i : self.addBlockCallback(a))
+            self.addBlockBtns[i].grid(row=i*2)
+
+    @profiled("ScriptViewFrame.insertBlock")
+    def insertBlock(self, idx: int):
+        if self.scriptBlocksFrame == None:
+            return
+        self.blocks.insert(idx, self.newBlock(idx))
+        self.addBlockBtns.insert(idx, self.newAddBlockButton(idx))
+        self.regridBlocks(idx + 1)
+
+    @profiled("ScriptViewFrame.removeBlock")
+    def removeBlock(self, idx: int):
+        self.notifyChange()
+        if self.scriptBlocksFrame == None:
+            return
+        block = self.blocks.pop(idx)
+        self.binder.unbind(block.blockData)
+        block.destroy()
+        self.addBlockBtns.pop(idx).destroy()
+        self.regridBlocks(idx)
 
     def addBlockCallback(self, idx: int):
         if self.selectBlockWindow == None:
@@ -253,58 +490,19 @@ class ScriptViewFrame(customtkinter.CTkFrame):
             self.selectBlockWindow = None
 
     def addBlockSelected(self, type: str, idx: int):
-        newBlock = {"type": type}
-        match type:
-            case "downloadFile":
-                newBlock["file"] = ""
-                newBlock["output"] = ""
-            case "downloadRelease":
-                newBlock["repo"] = ""
-                newBlock["file"] = ""
-                newBlock["output"] = ""
-                newBlock["includePrereleases"] = False # type: ignore
-            case "extractFile":
-                newBlock["file"] = ""
-                newBlock["input"] = ""
-                newBlock["output"] = ""
-            case "installCia":
-                newBlock["file"] = ""
-            case "bootTitle":
-                newBlock["TitleID"] = ""
-                newBlock["NAND"] = False # type: ignore
-            case "mkdir":
-                newBlock["directory"] = ""
-            case "rmdir":
-                newBlock["directory"] = ""
-                newBlock["required"] = False # type: ignore
-            case "move":
-                newBlock["old"] = ""
-                newBlock["new"] = ""
-            case "copy":
-                newBlock["source"] = ""
-                newBlock["destination"] = ""
-            case "deleteFile":
-                newBlock["file"] = ""
-            case "promptMessage":
-                newBlock["message"] = ""
-                newBlock["count"] = ""
-            case "skip":
-                newBlock["count"] = ""
-            case "exit":
-                pass
-            case _:
-                raise ValueError(f"Invalid block type {type}")
-        self.elementData[self.lastElementName].insert(idx, newBlock)
-        self.reloadBlocks()
+        self.elementData[self.lastElementName].insert(idx, newBlock(type))
+        self.notifyChange()
+        self.insertBlock(idx)
 
 class ScriptBlock(customtkinter.CTkFrame):
-    def __init__(self, master, blocksList: list, key: int, deleteCommand = None, **kwargs):
+    def __init__(self, master, blocksList: list, key: int, deleteCommand = None, binder: FieldBinder | None = None, **kwargs):
         super().__init__(master, corner_radius=0, **kwargs)
         self.columnconfigure(1, weight=1)
         self.blocksList = blocksList
         self.key = key
         self.blockData = blockData = blocksList[key]
         self.deleteCommand = deleteCommand
+        self.binder = binder
 
         self.type = type = self.blockData["type"]
 
@@ -315,76 +513,36 @@ class ScriptBlock(customtkinter.CTkFrame):
         blockDeleteBtn.grid(column=2, row=0)
         ToolTip(blockDeleteBtn, "Delete block")
 
-        if type == "downloadFile":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["file"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["output"])
-            self.newStringEntry("file", self.stringVar1, 1)
-            self.newStringEntry("output", self.stringVar2, 2)
-        elif type == "downloadRelease":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["repo"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["file"])
-            self.stringVar3 = customtkinter.StringVar(self, blockData["output"])
-            self.booleanVar1 = customtkinter.BooleanVar(self, blockData["includePrereleases"])
-            self.newStringEntry("repo", self.stringVar1, 1)
-            self.newStringEntry("file", self.stringVar2, 2)
-            self.newStringEntry("output", self.stringVar3, 3)
-            self.newBooleanCheckbox("includePrereleases", self.booleanVar1, 4)
-        elif type == "extractFile":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["file"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["input"])
-            self.stringVar3 = customtkinter.StringVar(self, blockData["output"])
-            self.newStringEntry("file", self.stringVar1, 1)
-            self.newStringEntry("input", self.stringVar2, 2)
-            self.newStringEntry("output", self.stringVar3, 3)
-        elif type == "installCia":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["file"])
-            self.newStringEntry("file", self.stringVar1, 1)
-        elif type == "bootTitle":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["TitleID"])
-            self.booleanVar1 = customtkinter.StringVar(self, blockData["NAND"])
-            self.newStringEntry("TitleID", self.stringVar1, 1)
-            self.newBooleanCheckbox("NAND", self.booleanVar1, 2)
-        elif type == "mkdir":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["directory"])
-            self.newStringEntry("directory", self.stringVar1, 1)
-        elif type == "rmdir":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["directory"])
-            self.booleanVar1 = customtkinter.BooleanVar(self, blockData["required"])
-            self.newStringEntry("directory", self.stringVar1, 1)
-            self.newBooleanCheckbox("required", self.booleanVar1, 2)
-        elif type == "move":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["old"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["new"])
-            self.newStringEntry("old", self.stringVar1, 1)
-            self.newStringEntry("new", self.stringVar2, 2)
-        elif type == "copy":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["source"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["destination"])
-            self.newStringEntry("source", self.stringVar1, 1)
-            self.newStringEntry("destination", self.stringVar2, 2)
-        elif type == "deleteFile":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["file"])
-            self.newStringEntry("file", self.stringVar1, 1)
-        elif type == "promptMessage":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["message"])
-            self.stringVar2 = customtkinter.StringVar(self, blockData["count"])
-            self.newStringEntry("message", self.stringVar1, 1)
-            self.newStringEntry("count", self.stringVar2, 2)
-        elif type == "skip":
-            self.stringVar1 = customtkinter.StringVar(self, blockData["count"])
-            self.newStringEntry("count", self.stringVar1, 1)
-        elif type == "exit":
-            pass
-        else:
+        fields = BLOCK_SCHEMA.get(type)
+        if fields == None:
             raise ValueError(f"Invalid block type {type}")
-    
-    def newStringEntry(self, name, var, r):
+        self.vars: dict[str, tkinter.Variable] = {}
+        row = 1
+        for field in fields:
+            if field.optional and not field.name in blockData:
+                continue
+            value = blockData.get(field.name, field.default)
+            if field.kind == "bool":
+                var = self.vars[field.name] = customtkinter.BooleanVar(self, value)
+                self.newBooleanCheckbox(field.name, var, row, field.default)
+            else:
+                var = self.vars[field.name] = customtkinter.StringVar(self, value)
+                self.newStringEntry(field.name, var, row, field.default)
+            row += 1
+
+    def newStringEntry(self, name, var, r, default = ""):
         self.newLabel(name, 0, r)
         self.newEntry(var, 1, r)
+        self.bindField(name, var, default)
 
-    def newBooleanCheckbox(self, name, var, r):
+    def newBooleanCheckbox(self, name, var, r, default = False):
         self.newLabel(name, 0, r)
         self.newCheckbox(var, 1, r)
+        self.bindField(name, var, default)
+
+    def bindField(self, name, var, default):
+        if self.binder != None:
+            self.binder.bindVar(var, self.blockData, name, default)
 
     def newLabel(self, name, c: int, r: int):
         lbl = customtkinter.CTkLabel(self, text=name, width=50, compound="left", anchor="w")
@@ -399,11 +557,14 @@ class ScriptBlock(customtkinter.CTkFrame):
         cb.grid(column=c, row=r, sticky="w", pady=(0, 5))
 
     def deleteBlock(self):
+        if self.binder != None:
+            self.binder.flush()
         self.blocksList.pop(self.key)
         if self.deleteCommand != None:
-            self.deleteCommand()
+            self.deleteCommand(self.key)
 
 class ScriptEditorWindow(tkinter.Toplevel):
+    @profiled("ScriptEditorWindow create")
     def __init__(self, master, storeData: StoreContent, key: int):
         super().__init__(master)
         self.geometry("600x400")
@@ -417,17 +578,23 @@ class ScriptEditorWindow(tkinter.Toplevel):
         self.mainframe.grid(column=0, row=0, sticky="wnes", padx=0, ipadx=0)
         self.mainframe.columnconfigure(0, weight=1)
 
-        i = 0
-        for name, value in storeData.storeContent[key].items():
+        # Only the headers are built here, the blocks of each script are
+        # created the first time it gets expanded and kept afterwards
+        self.scriptViews: list[ScriptViewFrame] = []
+        element = storeData.getEntry(key)
+        for name in element:
             if name != "info":
-                scriptView = ScriptViewFrame(self.mainframe, storeData.storeContent[key], name)
-                scriptView.grid(column=0, row=i, sticky="we", padx=10, pady=(5, 0))
-                i += 1
+                scriptView = ScriptViewFrame(self.mainframe, element, name, lambda : storeData.markDirty(self.elementKey))
+                scriptView.grid(column=0, row=len(self.scriptViews), sticky="we", padx=10, pady=(5, 0))
+                self.scriptViews.append(scriptView)
         
         self.bindid = self.bind("<Button-1>", self.on_click, add="+")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def on_close(self):
+        for scriptView in self.scriptViews:
+            scriptView.checkNameAndUpdate()
+        flushPendingEdits(self)
         self.unbind("<Button-1>", self.bindid)
         self.destroy()
 
@@ -438,6 +605,7 @@ class ScriptEditorWindow(tkinter.Toplevel):
             self.focus_set()
 
 class EditEntryWindow(tkinter.Toplevel):
+    @profiled("EditEntryWindow create")
     def __init__(self, master, storeData: StoreContent, key: int):
         super().__init__(master)
         self.geometry("450x500")
@@ -448,7 +616,9 @@ class EditEntryWindow(tkinter.Toplevel):
         self.storeData = storeData
         self.elementIdx = key
 
-        element = storeData.storeContent[key]
+        element = storeData.getEntry(key)
+        info = element["info"]
+        self.binder = FieldBinder(self, self.infoChanged)
 
         frame = customtkinter.CTkFrame(self, corner_radius=0)
         frame.grid(column=0, row=0, sticky="wnes", padx=0, ipadx=0)
@@ -458,7 +628,8 @@ class EditEntryWindow(tkinter.Toplevel):
         field = "Title"
         nameLabel = customtkinter.CTkLabel(frame, text=f"{field}: ")
         nameLabel.grid(column=0, row=row_i, sticky="w", pady=(5,0))
-        self.nameVar = customtkinter.StringVar(value=element["info"][field.lower()])
+        self.nameVar = customtkinter.StringVar(value=info[field.lower()])
+        self.binder.bindVar(self.nameVar, info, field.lower())
         nameEntry = customtkinter.CTkEntry(frame, textvariable=self.nameVar, width=60, border_width=0)
         nameEntry.grid(column=1, row=row_i, sticky="we", pady=(5,0))
 
@@ -466,7 +637,8 @@ class EditEntryWindow(tkinter.Toplevel):
         field = "Author"
         authorLabel = customtkinter.CTkLabel(frame, text=f"{field}: ")
         authorLabel.grid(column=0, row=row_i, sticky="w", pady=5)
-        self.authorVar = customtkinter.StringVar(value=element["info"][field.lower()])
+        self.authorVar = customtkinter.StringVar(value=info[field.lower()])
+        self.binder.bindVar(self.authorVar, info, field.lower())
         authorEntry = customtkinter.CTkEntry(frame, textvariable=self.authorVar, width=60, border_width=0)
         authorEntry.grid(column=1, row=row_i, sticky="we", pady=5)
 
@@ -474,7 +646,8 @@ class EditEntryWindow(tkinter.Toplevel):
         field = "Version"
         versionLabel = customtkinter.CTkLabel(frame, text=f"{field}: ")
         versionLabel.grid(column=0, row=row_i, sticky="w")
-        self.versionVar = customtkinter.StringVar(value=element["info"][field.lower()])
+        self.versionVar = customtkinter.StringVar(value=info[field.lower()])
+        self.binder.bindVar(self.versionVar, info, field.lower())
         versionEntry = customtkinter.CTkEntry(frame, textvariable=self.versionVar, width=60, border_width=0)
         versionEntry.grid(column=1, row=row_i, sticky="we")
 
@@ -482,7 +655,8 @@ class EditEntryWindow(tkinter.Toplevel):
         field = "Description"
         descLabel = customtkinter.CTkLabel(frame, text=f"{field}: ")
         descLabel.grid(column=0, row=row_i, sticky="w", pady=5)
-        self.descVar = customtkinter.StringVar(value=element["info"][field.lower()])
+        self.descVar = customtkinter.StringVar(value=info[field.lower()])
+        self.binder.bindVar(self.descVar, info, field.lower())
         descEntry = customtkinter.CTkEntry(frame, textvariable=self.descVar, width=60, border_width=0)
         descEntry.grid(column=1, row=row_i, sticky="we", pady=5)
 
@@ -490,7 +664,8 @@ class EditEntryWindow(tkinter.Toplevel):
         field = "License"
         licenseLabel = customtkinter.CTkLabel(frame, text=f"{field}: ")
         licenseLabel.grid(column=0, row=row_i, sticky="w")
-        self.licenseVar = customtkinter.StringVar(value=element["info"][field.lower()])
+        self.licenseVar = customtkinter.StringVar(value=info[field.lower()])
+        self.binder.bindVar(self.licenseVar, info, field.lower())
         licenseEntry = customtkinter.CTkEntry(frame, textvariable=self.licenseVar, width=60, border_width=0)
         licenseEntry.grid(column=1, row=row_i, sticky="we")
 
@@ -501,35 +676,56 @@ class EditEntryWindow(tkinter.Toplevel):
         self.openScriptEditViewBtn = customtkinter.CTkButton(frame, text="Open Script View", command=self.openScriptEditView)
         self.openScriptEditViewBtn.grid(column=1, row=row_i, sticky="we", pady=5)
 
+        screenshots = [localAssetPath(screenshot.get("url"), storeData.storeInfo) for screenshot in info.get("screenshots", []) if isinstance(screenshot, dict)]
+        screenshots = [path for path in screenshots if path != None]
+        if screenshots:
+            row_i += 1
+            self.geometry("450x650")
+            screenshotsLabel = customtkinter.CTkLabel(frame, text="Screenshots: ")
+            screenshotsLabel.grid(column=0, row=row_i, sticky="nw", pady=5)
+            screenshotsFrame = customtkinter.CTkScrollableFrame(frame, orientation="horizontal", height=SCREENSHOT_SIZE[1], corner_radius=0)
+            screenshotsFrame.grid(column=1, row=row_i, sticky="we", pady=5)
+            for i, path in enumerate(screenshots):
+                screenshotLabel = customtkinter.CTkLabel(screenshotsFrame, text="", image=placeholderImage(SCREENSHOT_SIZE))
+                screenshotLabel.grid(column=i, row=0, padx=(0, 5))
+                IMAGE_LOADER.request(self, ("screenshot", path, SCREENSHOT_SIZE), lambda path=path : decodeScreenshot(path, SCREENSHOT_SIZE),
+                                     lambda image, label=screenshotLabel : self.screenshotLoaded(label, image))
+
         row_i += 1
         frame.rowconfigure(row_i, weight=row_i)
         releaseNotesLabel = customtkinter.CTkLabel(frame, text="Release notes: ")
         releaseNotesLabel.grid(column=0, row=row_i, sticky="w")
         self.releaseNotesEntry = customtkinter.CTkTextbox(frame, width=45, height=15)
-        self.releaseNotesEntry.insert(tkinter.END, element["info"]["releasenotes"])
+        self.releaseNotesEntry.insert(tkinter.END, info["releasenotes"])
+        self.binder.bindTextbox(self.releaseNotesEntry, info, "releasenotes")
         self.releaseNotesEntry.grid(column=1, row=row_i, sticky="wnes")
 
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def on_close(self):
-        print("Saving changes")
+        flushPendingEdits(self)
         self.destroy()
 
+    def screenshotLoaded(self, label: customtkinter.CTkLabel, image: Image.Image | None):
+        if image != None and label.winfo_exists():
+            label.configure(image=customtkinter.CTkImage(image, size=image.size))
+
+    def infoChanged(self):
+        self.storeData.markDirty(self.elementIdx)
+        self.storeData.entryInfoChanged(self.elementIdx)
+
     def openScriptEditView(self):
         ScriptEditorWindow(self, self.storeData, self.elementIdx).focus()
 
 class StoreElementButton(customtkinter.CTkFrame):
+    @profiled("StoreElementButton create")
     def __init__(self, master: StoreElementsFrame, content: StoreContent, elementIdx: int, **kwargs):
         super().__init__(master, bg_color="transparent", corner_radius=0, **kwargs)
         self.master = master
-        btnTitle = content.storeContent[elementIdx]["info"]["title"]
-        maxLen = 30 if len(btnTitle) > 30 else len(btnTitle)
-        btnImage = Image.open(ICONS_DIR.joinpath(SPRITESHEET_CONTENT[content.storeContent[elementIdx]["info"]["icon_index"]]))
-        #btnIcon = ImageTk.PhotoImage(btnImage)
-        btnIcon = customtkinter.CTkImage(btnImage, size=(80, 80))
+        self.content = content
 
-        self.btn = customtkinter.CTkButton(self, height=100, text="", fg_color="transparent", image=btnIcon, corner_radius=0, border_spacing=0, border_width=0, hover=False)
-        self.label = customtkinter.CTkLabel(self, height=50, text=btnTitle[:maxLen], wraplength=80)
+        self.btn = customtkinter.CTkButton(self, height=100, text="", fg_color="transparent", corner_radius=0, border_spacing=0, border_width=0, hover=False)
+        self.label = customtkinter.CTkLabel(self, height=50, text="", wraplength=80)
         self.btn.bind("<Double-Button-1>", self.openEditWindow)
         self.btn.bind("<Enter>", self.on_enter)
         self.btn.bind("<Leave>", self.on_leave)
@@ -539,8 +735,23 @@ class StoreElementButton(customtkinter.CTkFrame):
         self.label.bind("<Leave>", self.on_leave)
         self.label.grid(column=0, row=1, sticky="wnes", padx=0, ipadx=0, pady=0, ipady=0)
 
-        self.content = content
+        self.setElement(elementIdx)
+
+    def setElement(self, elementIdx: int):
         self.elementIdx = elementIdx
+        # Identifies this request, the index alone can change on reload
+        self.iconRequest = request = object()
+        info = self.content.getInfo(elementIdx)
+        btnTitle = info["title"]
+        maxLen = 30 if len(btnTitle) > 30 else len(btnTitle)
+        btnIcon = ICON_CACHE.request(self, info["icon_index"], ICON_SIZE, lambda icon : self.iconLoaded(request, icon))
+        self.btn.configure(image=btnIcon if btnIcon != None else placeholderImage(ICON_SIZE), fg_color="transparent")
+        self.label.configure(text=btnTitle[:maxLen], fg_color="transparent")
+
+    def iconLoaded(self, request: object, icon: customtkinter.CTkImage):
+        # Recycled tiles may show another entry by now
+        if request is self.iconRequest and self.winfo_exists():
+            self.btn.configure(image=icon)
 
     def on_enter(self, event):
         self.btn.configure(fg_color="#14375e")
@@ -557,27 +768,142 @@ class StoreElementButton(customtkinter.CTkFrame):
         pass
 
 class StoreElementsFrame(customtkinter.CTkScrollableFrame):
-    def __init__(self, master: App, content: StoreContent, **kwargs):
+    def __init__(self, master: App, content: StoreContent, sortBy: str = "date", **kwargs):
         super().__init__(master, **kwargs)
         self.master = master
         self.content = content
-        self.columnconfigure((0, 1, 2, 3), weight=1)
-
-        if len(content.storeContent) > 1:
-            for i in range(len(content.storeContent) - 1):
-                date1 = parse_date(content.storeContent[i]["info"]["last_updated"])
-                for j in range(i + 1, len(content.storeContent)):
-                    date2 = parse_date(content.storeContent[j]["info"]["last_updated"])
-                    if date1 <= date2:
-                        date1 = date2
-                        aux = content.storeContent[i]
-                        content.storeContent[i] = content.storeContent[j]
-                        content.storeContent[j] = aux
-
-        for i in range(len(content.storeContent)):
-            self.rowconfigure((i // 4), weight=1)
-            elementButton = StoreElementButton(self, content, i)
-            elementButton.grid(column=(i % 4), row=(i // 4), sticky="wnes", padx=0, ipadx=0, pady=0, ipady=0)
+        self.columnconfigure(tuple(range(GRID_COLUMNS)), weight=1)
+
+        self.sortBy = sortBy
+        self.filterIndexes: set[int] | None = None
+        self.elementButtons: dict[int, StoreElementButton] = {}
+        self.loadElements()
+
+    def visibleIndexes(self) -> list[int]:
+        return self.content.sortedIndexes(self.sortBy, subset=self.filterIndexes)
+
+    @profiled("StoreElementsFrame.loadElements")
+    def loadElements(self):
+        # Tiles are kept per entry, re-sorting or filtering only moves them
+        for elementButton in self.elementButtons.values():
+            elementButton.grid_remove()
+
+        for i, elementIdx in enumerate(self.visibleIndexes()):
+            self.rowconfigure((i // GRID_COLUMNS), weight=1)
+            elementButton = self.elementButtons.get(elementIdx)
+            if elementButton == None:
+                elementButton = self.elementButtons[elementIdx] = StoreElementButton(self, self.content, elementIdx)
+            elementButton.grid(column=(i % GRID_COLUMNS), row=(i // GRID_COLUMNS), sticky="wnes", padx=0, ipadx=0, pady=0, ipady=0)
+
+    def setSortBy(self, sortBy: str):
+        if sortBy != self.sortBy:
+            self.sortBy = sortBy
+            self.loadElements()
+
+    @profiled("StoreElementsFrame.patchElements")
+    def patchElements(self, remap: dict[int, int], changed: set[int], filterIndexes: set[int] | None):
+        # After StoreContent.reload(): tiles of unchanged entries are only
+        # moved, changed ones redrawn, removed ones destroyed
+        elementButtons = {}
+        for oldIdx, elementButton in self.elementButtons.items():
+            newIdx = remap.get(oldIdx)
+            if newIdx == None:
+                elementButton.destroy()
+            else:
+                if newIdx in changed:
+                    elementButton.setElement(newIdx)
+                else:
+                    elementButton.elementIdx = newIdx
+                elementButtons[newIdx] = elementButton
+        self.elementButtons = elementButtons
+        self.filterIndexes = filterIndexes
+        top = self._parent_canvas.yview()[0]
+        self.loadElements()
+        self._parent_canvas.yview_moveto(top)
+
+    def setFilter(self, filterIndexes: set[int] | None):
+        if filterIndexes != self.filterIndexes:
+            self.filterIndexes = filterIndexes
+            self.loadElements()
+
+class VirtualStoreElementsFrame(StoreElementsFrame):
+    def __init__(self, master: App, content: StoreContent, sortBy: str = "date", overscanRows: int = 1, **kwargs):
+        self.overscanRows = overscanRows
+        self.order: list[int] = []
+        self.visibleTiles: dict[int, StoreElementButton] = {}
+        self.freeTiles: list[StoreElementButton] = []
+        self.rowHeight = 1
+        super().__init__(master, content, sortBy, **kwargs)
+
+        self._parent_canvas.configure(yscrollcommand=self.onScroll)
+        self._parent_canvas.bind("<Configure>", lambda e: self.updateVisibleTiles(), add="+")
+
+    def onScroll(self, first, last):
+        self._scrollbar.set(first, last)
+        self.updateVisibleTiles()
+
+    @profiled("VirtualStoreElementsFrame.loadElements")
+    def loadElements(self):
+        self.order = self.visibleIndexes()
+        for position in list(self.visibleTiles):
+            self.releaseTile(position)
+
+        # Tiles are placed, so the inner frame only gets its height from here
+        self.rowHeight = max(1, round(self._apply_widget_scaling(GRID_TILE_HEIGHT)))
+        rows = (len(self.order) + GRID_COLUMNS - 1) // GRID_COLUMNS
+        tkinter.Frame.configure(self, height=max(1, rows * self.rowHeight))
+        self._parent_canvas.yview_moveto(0)
+        self.updateVisibleTiles()
+
+    @profiled("VirtualStoreElementsFrame.patchElements")
+    def patchElements(self, remap: dict[int, int], changed: set[int], filterIndexes: set[int] | None):
+        # Tiles still showing the same unchanged entry at the same position
+        # stay, the rest are released and refilled at the current scroll
+        top = self._parent_canvas.yview()[0]
+        self.filterIndexes = filterIndexes
+        self.order = self.visibleIndexes()
+        for position, tile in list(self.visibleTiles.items()):
+            newIdx = remap.get(tile.elementIdx)
+            if position < len(self.order) and self.order[position] == newIdx and not newIdx in changed:
+                tile.elementIdx = newIdx
+            else:
+                self.releaseTile(position)
+
+        rows = (len(self.order) + GRID_COLUMNS - 1) // GRID_COLUMNS
+        tkinter.Frame.configure(self, height=max(1, rows * self.rowHeight))
+        self._parent_canvas.yview_moveto(top)
+        self.updateVisibleTiles()
+
+    def releaseTile(self, position: int):
+        tile = self.visibleTiles.pop(position)
+        tile.place_forget()
+        self.freeTiles.append(tile)
+
+    @profiled("VirtualStoreElementsFrame.updateVisibleTiles")
+    def updateVisibleTiles(self):
+        canvas = self._parent_canvas
+        top = canvas.canvasy(0)
+        height = max(canvas.winfo_height(), self.rowHeight)
+        rows = (len(self.order) + GRID_COLUMNS - 1) // GRID_COLUMNS
+        firstRow = max(0, int(top // self.rowHeight) - self.overscanRows)
+        lastRow = min(rows - 1, int((top + height) // self.rowHeight) + self.overscanRows)
+        wanted = range(firstRow * GRID_COLUMNS, min((lastRow + 1) * GRID_COLUMNS, len(self.order)))
+
+        for position in list(self.visibleTiles):
+            if not position in wanted:
+                self.releaseTile(position)
+
+        for position in wanted:
+            if position in self.visibleTiles:
+                continue
+            elementIdx = self.order[position]
+            if self.freeTiles:
+                tile = self.freeTiles.pop()
+                tile.setElement(elementIdx)
+            else:
+                tile = StoreElementButton(self, self.content, elementIdx)
+            tile.place(relx=(position % GRID_COLUMNS) / GRID_COLUMNS, y=(position // GRID_COLUMNS) * GRID_TILE_HEIGHT, relwidth=1 / GRID_COLUMNS)
+            self.visibleTiles[position] = tile
 
 class App(tkinter.Tk):
     def __init__(self):
@@ -586,7 +912,7 @@ class App(tkinter.Tk):
         self.title("Unistore Tool")
         self.geometry('640x400')
         self.columnconfigure(0, weight=1)
-        self.rowconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
 
         # -------------------------------
         menubar = tkinter.Menu(self)
@@ -598,33 +924,98 @@ class App(tkinter.Tk):
         file_menu.add_command(label="Exit", command=self.closeApp)
 
         menubar.add_cascade(label="File", menu=file_menu, underline=0)
+
+        self.sortByVar = tkinter.StringVar(self, value="date")
+        view_menu = tkinter.Menu(menubar, tearoff=False)
+        for label, value in (("Sort by date", "date"), ("Sort by title", "title"), ("Sort by category", "category")):
+            view_menu.add_radiobutton(label=label, value=value, variable=self.sortByVar, command=self.sortElements)
+
+        menubar.add_cascade(label="View", menu=view_menu, underline=0)
         # -------------------------------
 
-        self.unistoreData = StoreContent(Path(UNISTORE_FILENAME))
-        self.elementsContainer = StoreElementsFrame(self, self.unistoreData, corner_radius=0)
-        self.elementsContainer.grid(column=0, row=0, sticky="wnes")
+        # No textvariable here, CTkEntry hides the placeholder when it has one
+        self.searchEntry = customtkinter.CTkEntry(self, placeholder_text="Search (title, author:, category:, console:)", corner_radius=0, border_width=0)
+        self.searchEntry.grid(column=0, row=0, sticky="we")
+        self.searchEntry.bind("<KeyRelease>", self.filterElements)
+
+        self.elementsContainer = None
+        self.watcher = None
+        self.loadContent(UNISTORE_FILENAME)
+
+        watchEventLoop(self)
 
         self.editEntry = None
         self.lastValue = None
         self.saved = True
 
+    def sortElements(self):
+        self.elementsContainer.setSortBy(self.sortByVar.get())
+
+    def filterElements(self, *args):
+        self.elementsContainer.setFilter(self.unistoreData.search(self.searchEntry.get()))
+
     def loadContent(self, fp: Path):
-        self.unistoreData = StoreContent(fp)
-        sortedElements = []
-        indexes = []
-        for key, element in enumerate(self.unistoreData.storeContent):
-            if len(sortedElements) == 0:
-                sortedElements.append(element)
-                indexes.append(key)
-            else:
-                i = 0
-                while i < len(sortedElements) and sortedElements[i]["info"]["title"] < element["info"]["title"]:
-                    i += 1
-                sortedElements.insert(i, element)
-                indexes.insert(i, key)
+        self.unistoreData = StoreContent(fp, lazy=True)
+        if self.watcher != None:
+            self.watcher.stop()
+        self.watcher = FileWatcher(self, fp, self.fileChanged)
+        self.buildElementsContainer()
+
+    def buildElementsContainer(self):
+        if self.elementsContainer != None:
+            self.elementsContainer.destroy()
+        if len(self.unistoreData.storeContent) > VIRTUAL_GRID_THRESHOLD:
+            self.elementsContainer = VirtualStoreElementsFrame(self, self.unistoreData, self.sortByVar.get(), corner_radius=0)
+        else:
+            self.elementsContainer = StoreElementsFrame(self, self.unistoreData, self.sortByVar.get(), corner_radius=0)
+        self.elementsContainer.grid(column=0, row=1, sticky="wnes")
+        self.filterElements()
+
+    @profiled("App.fileChanged")
+    def fileChanged(self):
+        flushPendingEdits(self)
+        if self.unistoreData.isDirty() and not tkinter.messagebox.askyesno(title="File changed",
+                message=f"{self.unistoreData.path.name} changed on disk. Reload it and drop the unsaved changes?"):
+            return
+        try:
+            changes = self.unistoreData.reload()
+        except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            # Read halfway through being written, which the write finishing
+            # changes again, or content that doesn't decode. The previous
+            # state is kept either way
+            print(f"Could not reload {self.unistoreData.path.name}: {e}", file=sys.stderr)
+            return
+        self.saved = not self.unistoreData.isDirty()
+        if changes == None:
+            return
+        remap, changed = changes
+        self.patchOpenWindows(remap, changed)
+
+        virtual = len(self.unistoreData.storeContent) > VIRTUAL_GRID_THRESHOLD
+        if virtual != isinstance(self.elementsContainer, VirtualStoreElementsFrame):
+            self.buildElementsContainer()
+        else:
+            self.elementsContainer.patchElements(remap, changed, self.unistoreData.search(self.searchEntry.get()))
+
+    def patchOpenWindows(self, remap: dict[int, int], changed: set[int]):
+        # Editors of unchanged entries follow them to their new index, the
+        # others would show what isn't in the file anymore and are closed
+        for window in self.winfo_children():
+            if not isinstance(window, EditEntryWindow):
+                continue
+            newIdx = remap.get(window.elementIdx)
+            if newIdx == None or newIdx in changed:
+                window.destroy()
+                continue
+            window.elementIdx = newIdx
+            for child in window.winfo_children():
+                if isinstance(child, ScriptEditorWindow):
+                    child.elementKey = newIdx
 
     def saveChanges(self):
-        pass
+        flushPendingEdits(self)
+        self.unistoreData.save()
+        self.saved = not self.unistoreData.isDirty()
 
     def closeApp(self, val=None):
         if self.askForChanges():
@@ -633,6 +1024,8 @@ class App(tkinter.Tk):
             pass
 
     def askForChanges(self):
+        flushPendingEdits(self)
+        self.saved = not self.unistoreData.isDirty()
         if self.saved:
             return True
         else:
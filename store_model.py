@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+# Typed, __slots__ based records for the store entries and their install
+# scripts. Every record can be used like the dict it was decoded from
+# (record["file"], record.get(...), "key" in record) and turns back into the
+# same JSON: keys the schema doesn't know are kept aside and a key order
+# that differs from the schema one is remembered
+
+class Field:
+    __slots__ = ("name", "kind", "default", "optional")
+
+    def __init__(self, name: str, kind: str = "string", default = "", optional: bool = False):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        # Optional fields are left out of new records and only shown when present
+        self.optional = optional
+
+    def newValue(self):
+        return list(self.default) if isinstance(self.default, list) else self.default
+
+def message() -> Field:
+    return Field("message", optional=True)
+
+BLOCK_SCHEMA: dict[str, tuple[Field, ...]] = {
+    "downloadFile": (Field("file"), Field("output"), message()),
+    "downloadRelease": (Field("repo"), Field("file"), Field("output"), Field("includePrereleases", "bool", False), message()),
+    "extractFile": (Field("file"), Field("input"), Field("output"), message()),
+    "installCia": (Field("file"), message()),
+    "bootTitle": (Field("TitleID"), Field("NAND", "bool", False), message()),
+    "mkdir": (Field("directory"), message()),
+    "rmdir": (Field("directory"), Field("required", "bool", False), message()),
+    "move": (Field("old"), Field("new"), message()),
+    "copy": (Field("source"), Field("destination"), message()),
+    "deleteFile": (Field("file"), message()),
+    "promptMessage": (Field("message"), Field("count", "count", 1)),
+    "skip": (Field("count", "count", 1),),
+    "exit": (),
+}
+
+INFO_SCHEMA: tuple[Field, ...] = (
+    Field("title"),
+    Field("author"),
+    Field("version"),
+    Field("category", "list", []),
+    Field("console", "list", ["3DS"]),
+    Field("description"),
+    Field("license"),
+    Field("icon_index", "count", 0),
+    Field("sheet_index", "count", 0),
+    Field("last_updated"),
+    Field("releasenotes"),
+    Field("screenshots", "list", [], optional=True),
+)
+
+# Records with the same unusual key order share one tuple
+_keyOrders: dict[tuple, tuple] = {}
+
+class Record:
+    __slots__ = ("extra", "keyOrder")
+    fields: tuple[Field, ...] = ()
+    fixedKeys: tuple[str, ...] = ()
+
+    def __init__(self):
+        self.extra = None
+        self.keyOrder = None
+
+    @classmethod
+    def new(cls):
+        record = cls()
+        for field in cls.fields:
+            if not field.optional:
+                setattr(record, field.name, field.newValue())
+        return record
+
+    @classmethod
+    def fromJson(cls, data: dict):
+        record = cls()
+        for key, value in data.items():
+            record[key] = value
+        order = tuple(data)
+        if order != tuple(record.keys()):
+            record.keyOrder = _keyOrders.setdefault(order, order)
+        return record
+
+    def fixedValue(self, key: str):
+        raise KeyError(key)
+
+    def __getitem__(self, key: str):
+        if key in self.fixedKeys:
+            return self.fixedValue(key)
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra != None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self.fixedKeys:
+            if value != self.fixedValue(key):
+                raise ValueError(f"{key} of a {type(self).__name__} can't be changed")
+        elif key in self.__slots__:
+            setattr(self, key, value)
+        else:
+            if self.extra == None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self.__slots__:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra != None and key in self.extra:
+            del self.extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default = None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list[str]:
+        keys = [key for key in self.fixedKeys]
+        keys += [field.name for field in self.fields if hasattr(self, field.name)]
+        if self.extra != None:
+            keys += self.extra
+        if self.keyOrder != None:
+            present = set(keys)
+            ordered = [key for key in self.keyOrder if key in present]
+            seen = set(ordered)
+            keys = ordered + [key for key in keys if not key in seen]
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def toJson(self) -> dict:
+        # Shallow, nested records are turned into dicts by jsonDefault
+        return {key: self[key] for key in self.keys()}
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Record, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.toJson()!r})"
+
+class Block(Record):
+    __slots__ = ()
+    type = ""
+    fixedKeys = ("type",)
+
+    def fixedValue(self, key: str):
+        return self.type
+
+class EntryInfo(Record):
+    __slots__ = tuple(field.name for field in INFO_SCHEMA)
+    fields = INFO_SCHEMA
+
+def makeBlockClass(blockType: str, fields: tuple[Field, ...]) -> type[Block]:
+    name = blockType[0].upper() + blockType[1:] + "Block"
+    return type(name, (Block,), {"__slots__": tuple(field.name for field in fields), "type": blockType, "fields": fields, "__module__": __name__})
+
+BLOCK_CLASSES: dict[str, type[Block]] = {blockType: makeBlockClass(blockType, fields) for blockType, fields in BLOCK_SCHEMA.items()}
+globals().update({blockClass.__name__: blockClass for blockClass in BLOCK_CLASSES.values()})
+
+def newBlock(blockType: str) -> Block:
+    blockClass = BLOCK_CLASSES.get(blockType)
+    if blockClass == None:
+        raise ValueError(f"Invalid block type {blockType}")
+    return blockClass.new()
+
+def decodeBlock(data):
+    # Blocks of an unknown type are kept as they are
+    if isinstance(data, dict):
+        blockClass = BLOCK_CLASSES.get(data.get("type"))
+        if blockClass != None:
+            return blockClass.fromJson(data)
+    return data
+
+class StoreEntry:
+    # Behaves like the {"info": ..., "<script name>": [blocks]} dict
+    __slots__ = ("info", "scripts", "infoPosition")
+
+    def __init__(self, info = None, scripts: dict | None = None):
+        self.info = EntryInfo.new() if info == None else info
+        self.scripts: dict[str, list] = {} if scripts == None else scripts
+        self.infoPosition = 0
+
+    @classmethod
+    def fromJson(cls, data: dict) -> StoreEntry:
+        entry = cls({}, {})
+        for position, (key, value) in enumerate(data.items()):
+            if key == "info":
+                entry.info = EntryInfo.fromJson(value) if isinstance(value, dict) else value
+                entry.infoPosition = position
+            elif isinstance(value, list):
+                entry.scripts[key] = [decodeBlock(block) for block in value]
+            else:
+                entry.scripts[key] = value
+        return entry
+
+    def keys(self) -> list[str]:
+        keys = list(self.scripts)
+        keys.insert(min(self.infoPosition, len(keys)), "info")
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.scripts) + 1
+
+    def __getitem__(self, key: str):
+        if key == "info":
+            return self.info
+        return self.scripts[key]
+
+    def __setitem__(self, key: str, value):
+        if key == "info":
+            self.info = value
+        else:
+            self.scripts[key] = value
+
+    def __delitem__(self, key: str):
+        if key == "info":
+            raise KeyError("info can't be removed from an entry")
+        del self.scripts[key]
+
+    def __contains__(self, key) -> bool:
+        return key == "info" or key in self.scripts
+
+    def get(self, key: str, default = None):
+        return self[key] if key in self else default
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def toJson(self) -> dict:
+        return {key: self[key] for key in self.keys()}
+
+    def __repr__(self) -> str:
+        return f"StoreEntry({self.toJson()!r})"
+
+def jsonDefault(obj):
+    # For json.dumps(default=...), records are dumped like the dicts they came from
+    if isinstance(obj, (Record, StoreEntry)):
+        return obj.toJson()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import os, sys, time, json, atexit, threading
+from functools import wraps
+
+# Profiling is opt-in through UNISTORE_PROFILE, the editor also sets it
+# from its --profile[=trace.json] argument. It has to be known at import
+# time: when disabled, profiled() hands back the original function and
+# nothing else gets patched. UNISTORE_PROFILE=1 prints a summary on exit,
+# any other value is used as the path of a Chrome trace (chrome://tracing,
+# Perfetto)
+PROFILE_TARGET = os.environ.get("UNISTORE_PROFILE", "")
+ENABLED = not PROFILE_TARGET in ("", "0")
+
+STALL_THRESHOLD_MS = float(os.environ.get("UNISTORE_PROFILE_STALL_MS", 100))
+
+_start = time.perf_counter()
+_events: list[dict] = []
+_widgets = {"created": 0, "destroyed": 0}
+_counters: dict[str, object] = {}
+
+def _nowUs() -> float:
+    return (time.perf_counter() - _start) * 1e6
+
+def record(name: str, startUs: float, durationUs: float, **args):
+    _events.append({"name": name, "ph": "X", "ts": startUs, "dur": durationUs, "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+
+class Span:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        if ENABLED:
+            self.created = _widgets["created"]
+            self.destroyed = _widgets["destroyed"]
+            self.start = _nowUs()
+        return self
+
+    def __exit__(self, *exc):
+        if ENABLED:
+            record(self.name, self.start, _nowUs() - self.start,
+                   widgetsCreated=_widgets["created"] - self.created,
+                   widgetsDestroyed=_widgets["destroyed"] - self.destroyed)
+        return False
+
+def profiled(name: str):
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def addCounters(name: str, getCounters):
+    # getCounters() -> dict is read once, when the profile is written
+    _counters[name] = getCounters
+
+def counters() -> dict[str, dict]:
+    return {name: getCounters() for name, getCounters in _counters.items()}
+
+def _countWidgets():
+    import tkinter
+
+    originalInit = tkinter.BaseWidget.__init__
+    originalDestroy = tkinter.BaseWidget.destroy
+
+    def countingInit(self, *args, **kwargs):
+        _widgets["created"] += 1
+        originalInit(self, *args, **kwargs)
+
+    def countingDestroy(self):
+        _widgets["destroyed"] += 1
+        originalDestroy(self)
+
+    tkinter.BaseWidget.__init__ = countingInit
+    tkinter.BaseWidget.destroy = countingDestroy
+
+def watchEventLoop(root, intervalMs: int = 50, thresholdMs: float = STALL_THRESHOLD_MS):
+    # A heartbeat that should fire every intervalMs, any extra delay is
+    # time the Tk main loop spent busy
+    if not ENABLED:
+        return
+
+    def beat(expected: float):
+        now = time.perf_counter()
+        lateMs = (now - expected) * 1000
+        if lateMs > thresholdMs:
+            record("event loop stall", (expected - _start) * 1e6, lateMs * 1000)
+        root.after(intervalMs, beat, time.perf_counter() + intervalMs / 1000)
+
+    root.after(intervalMs, beat, time.perf_counter() + intervalMs / 1000)
+
+def summary() -> str:
+    totals = {}
+    for event in _events:
+        total = totals.setdefault(event["name"], {"count": 0, "total": 0.0, "max": 0.0, "created": 0, "destroyed": 0})
+        total["count"] += 1
+        total["total"] += event["dur"]
+        total["max"] = max(total["max"], event["dur"])
+        total["created"] += event["args"].get("widgetsCreated", 0)
+        total["destroyed"] += event["args"].get("widgetsDestroyed", 0)
+
+    lines = [f"{'span':40} {'count':>7} {'total ms':>10} {'max ms':>9} {'+widgets':>9} {'-widgets':>9}"]
+    for name, total in sorted(totals.items(), key=lambda item : -item[1]["total"]):
+        lines.append(f"{name:40} {total['count']:7} {total['total'] / 1000:10.2f} {total['max'] / 1000:9.2f} {total['created']:9} {total['destroyed']:9}")
+    lines.append(f"Tk widgets created: {_widgets['created']}, destroyed: {_widgets['destroyed']}")
+    for name, values in counters().items():
+        lines.append(f"{name}: " + ", ".join(f"{key} {value}" for key, value in values.items()))
+    return "\n".join(lines)
+
+def dump():
+    if PROFILE_TARGET == "1":
+        print(summary(), file=sys.stderr)
+    else:
+        with open(PROFILE_TARGET, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": _events, "displayTimeUnit": "ms", "otherData": counters()}, f)
+        print(f"Profile trace written to {PROFILE_TARGET}", file=sys.stderr)
+
+if ENABLED:
+    _countWidgets()
+    atexit.register(dump)
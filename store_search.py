@@ -0,0 +1,86 @@
+from __future__ import annotations
+import re
+from bisect import bisect_left, insort
+
+SEARCH_FIELDS = ("title", "author", "category", "console", "description")
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+def tokenize(value) -> set[str]:
+    if isinstance(value, list):
+        return set().union(*(tokenize(item) for item in value))
+    if not isinstance(value, str):
+        return set()
+    return set(TOKEN_PATTERN.findall(value.lower()))
+
+class SearchIndex:
+    # Inverted index over the info fields of the entries. Each field keeps
+    # token -> entry indexes plus a sorted token list, so prefixes typed
+    # so far can be looked up with bisect instead of scanning the entries
+    def __init__(self):
+        self.postings: dict[str, dict[str, set[int]]] = {field: {} for field in SEARCH_FIELDS}
+        self.tokens: dict[str, list[str]] = {field: [] for field in SEARCH_FIELDS}
+        self.entryTokens: dict[int, dict[str, set[str]]] = {}
+
+    def add(self, idx: int, info: dict):
+        entryTokens = {}
+        for field in SEARCH_FIELDS:
+            fieldTokens = entryTokens[field] = tokenize(info.get(field))
+            postings = self.postings[field]
+            for token in fieldTokens:
+                entries = postings.get(token)
+                if entries == None:
+                    entries = postings[token] = set()
+                    insort(self.tokens[field], token)
+                entries.add(idx)
+        self.entryTokens[idx] = entryTokens
+
+    def remove(self, idx: int):
+        entryTokens = self.entryTokens.pop(idx, None)
+        if entryTokens == None:
+            return
+        for field, fieldTokens in entryTokens.items():
+            postings = self.postings[field]
+            for token in fieldTokens:
+                entries = postings[token]
+                entries.discard(idx)
+                if not entries:
+                    del postings[token]
+                    tokens = self.tokens[field]
+                    del tokens[bisect_left(tokens, token)]
+
+    def update(self, idx: int, info: dict):
+        self.remove(idx)
+        self.add(idx, info)
+
+    def matchPrefix(self, field: str, prefix: str) -> set[int]:
+        tokens = self.tokens[field]
+        postings = self.postings[field]
+        result = set()
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            result |= postings[tokens[i]]
+            i += 1
+        return result
+
+    def search(self, query: str) -> set[int] | None:
+        # Whitespace separated terms must all match, "field:term" limits a
+        # term to one field. An empty query returns None (no filter)
+        result = None
+        for term in query.lower().split():
+            fields = SEARCH_FIELDS
+            field, _, value = term.partition(":")
+            if field in SEARCH_FIELDS and value != "":
+                fields = (field,)
+                term = value
+            termMatches = None
+            for prefix in TOKEN_PATTERN.findall(term):
+                prefixMatches = set()
+                for field in fields:
+                    prefixMatches |= self.matchPrefix(field, prefix)
+                termMatches = prefixMatches if termMatches == None else termMatches & prefixMatches
+            if termMatches == None:
+                continue
+            result = termMatches if result == None else result & termMatches
+            if not result:
+                return result
+        return result
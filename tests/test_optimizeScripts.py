@@ -0,0 +1,124 @@
+import os, sys, unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent.joinpath("utils")))
+from optimizeScripts import EXISTS, ABSENT, UNKNOWN, VirtualSD, redundant_steps
+
+def download(output: str) -> dict:
+    return {"type": "downloadFile", "file": "https://example.com/a.7z", "output": output}
+
+def rmdir(directory: str) -> dict:
+    return {"type": "rmdir", "directory": directory}
+
+def mkdir(directory: str) -> dict:
+    return {"type": "mkdir", "directory": directory}
+
+def delete(path: str) -> dict:
+    return {"type": "deleteFile", "file": path}
+
+def extract(file: str, output: str) -> dict:
+    return {"type": "extractFile", "file": file, "input": "", "output": output}
+
+class VirtualSDTest(unittest.TestCase):
+    def test_parent_change_decides(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/o/a", EXISTS, False)
+        sd.set("sdmc:/o", ABSENT, False)
+        self.assertEqual(sd.state("sdmc:/o/a"), ABSENT)
+
+    def test_write_inside_brings_directory_back(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/o", ABSENT, False)
+        sd.set("sdmc:/o/a.7z", EXISTS, False)
+        self.assertEqual(sd.state("sdmc:/o"), EXISTS)
+
+    def test_unknown_inside_makes_directory_unknown(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/o", ABSENT, False)
+        sd.set("sdmc:/o/x", UNKNOWN, False)
+        self.assertEqual(sd.state("sdmc:/o"), UNKNOWN)
+
+    def test_created_parent_leaves_inside_unknown(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/luma", EXISTS, False)
+        self.assertEqual(sd.state("sdmc:/luma/titles"), UNKNOWN)
+
+    def test_delete_inside_keeps_directory_gone(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/o", ABSENT, False)
+        sd.set("sdmc:/o/a", ABSENT, False)
+        self.assertEqual(sd.state("sdmc:/o"), ABSENT)
+
+    def test_sibling_prefix_is_not_inside(self):
+        sd = VirtualSD()
+        sd.set("sdmc:/o", ABSENT, False)
+        sd.set("sdmc:/other/a", EXISTS, False)
+        self.assertEqual(sd.state("sdmc:/o"), ABSENT)
+
+class RedundantStepsTest(unittest.TestCase):
+    def test_rmdir_write_inside_rmdir(self):
+        blocks = [rmdir("sdmc:/o"), download("sdmc:/o/a.7z"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {1: "removed by step 2 before it's used"})
+
+    def test_rmdir_mkdir_inside_rmdir(self):
+        blocks = [rmdir("sdmc:/o"), mkdir("sdmc:/o/sub"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_rmdir_copy_inside_rmdir(self):
+        blocks = [rmdir("sdmc:/o"), {"type": "copy", "source": "sdmc:/a", "destination": "sdmc:/o/a"}, rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_rmdir_extract_inside_rmdir(self):
+        blocks = [download("sdmc:/a.7z"), rmdir("sdmc:/o"), extract("sdmc:/a.7z", "sdmc:/o/"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_mkdir_inside_new_directory(self):
+        blocks = [mkdir("sdmc:/luma"), mkdir("sdmc:/luma/titles")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_rmdir_mkdir_mkdir_inside(self):
+        blocks = [rmdir("sdmc:/o"), mkdir("sdmc:/o"), mkdir("sdmc:/o/sub")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_mkdir_twice(self):
+        blocks = [mkdir("sdmc:/luma"), mkdir("sdmc:/luma")]
+        self.assertEqual(redundant_steps(blocks), {1: "directory already exists"})
+
+    def test_rmdir_twice(self):
+        blocks = [rmdir("sdmc:/o"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {1: "directory is already gone"})
+
+    def test_delete_after_rmdir(self):
+        blocks = [rmdir("sdmc:/o"), delete("sdmc:/o/a")]
+        self.assertEqual(redundant_steps(blocks), {1: "file is already gone"})
+
+    def test_overwritten_download(self):
+        blocks = [download("sdmc:/a.7z"), download("sdmc:/a.7z")]
+        self.assertEqual(redundant_steps(blocks), {0: "overwritten by step 1 before it's used"})
+
+class ConditionalStepsTest(unittest.TestCase):
+    def test_skipped_write_inside_rmdir(self):
+        # The download may not run, the directory may or may not be back so
+        # the second rmdir stays. The download is removed unread either way
+        blocks = [rmdir("sdmc:/o"), {"type": "promptMessage", "message": "", "count": 1}, download("sdmc:/o/a.7z"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {2: "removed by step 3 before it's used"})
+
+    def test_skipped_rmdir_keeps_second(self):
+        blocks = [{"type": "promptMessage", "message": "", "count": 1}, rmdir("sdmc:/o"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_skipped_overwrite_keeps_first(self):
+        blocks = [download("sdmc:/a.7z"), {"type": "skip", "count": 1}, download("sdmc:/a.7z")]
+        self.assertEqual(redundant_steps(blocks), {})
+
+    def test_step_after_range_runs(self):
+        blocks = [{"type": "promptMessage", "message": "", "count": 1}, mkdir("sdmc:/x"), rmdir("sdmc:/o"), rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {3: "directory is already gone"})
+
+    def test_conditional_rmdir_same_state(self):
+        # Removing what is already gone is redundant whether it runs or not
+        blocks = [rmdir("sdmc:/o"), {"type": "skip", "count": 1}, rmdir("sdmc:/o")]
+        self.assertEqual(redundant_steps(blocks), {2: "directory is already gone"})
+
+if __name__ == "__main__":
+    unittest.main()
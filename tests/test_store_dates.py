@@ -0,0 +1,39 @@
+import os, sys, unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_dates import legacyParseDate, parse_date, parseTimestamp
+
+class ParseDateTest(unittest.TestCase):
+    def assertBothReject(self, date_str: str):
+        with self.assertRaises(ValueError):
+            legacyParseDate(date_str)
+        with self.assertRaises(ValueError):
+            parse_date(date_str)
+
+    def test_same_as_strptime(self):
+        for date_str in ("2024-01-05 at 3:07 (UTC)", "2024-12-20 at 0:00 (UTC)", "2024-02-29 at 23:59 (CST)",
+                         "2024-1-5 at 03:7 (CDT)", "1999-12-31  at 12:30 (UTC)"):
+            self.assertEqual(parse_date(date_str), legacyParseDate(date_str))
+
+    def test_timestamp(self):
+        self.assertEqual(parseTimestamp("1970-01-01 at 0:00 (UTC)"), 0)
+        self.assertEqual(parseTimestamp("1970-01-01 at 0:00 (CST)"), 6 * 3600)
+
+    def test_signs_rejected(self):
+        self.assertBothReject("+2024-01-05 at 3:07 (UTC)")
+        self.assertBothReject("2024-+1-05 at 3:07 (UTC)")
+        self.assertBothReject("2024-01-05 at -3:07 (UTC)")
+
+    def test_other_int_forms_rejected(self):
+        self.assertBothReject("2_024-01-05 at 3:07 (UTC)")
+        self.assertBothReject("2024-01-05 at 3:0_7 (UTC)")
+
+    def test_invalid_dates_rejected(self):
+        self.assertBothReject("2024-13-01 at 0:00 (UTC)")
+        self.assertBothReject("2023-02-29 at 0:00 (UTC)")
+        self.assertBothReject("2024-01-05 at 24:00 (UTC)")
+        self.assertBothReject("2024-01-05 at 3:07 (PST)")
+
+if __name__ == "__main__":
+    unittest.main()
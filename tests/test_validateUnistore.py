@@ -0,0 +1,67 @@
+import os, sys, json, tempfile, unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent.joinpath("utils")))
+from validateUnistore import EntryDict, validate
+
+STORE_INFO = {"title": "t", "author": "a", "description": "d", "file": "t.unistore", "url": "https://example.com/t.unistore",
+              "sheet": "t.t3x", "sheetURL": "https://example.com/t.t3x", "version": 3, "revision": 1}
+
+def entry(title: str) -> dict:
+    info = {"title": title, "author": "a", "version": "v1", "category": ["mod"], "console": ["3DS"], "description": "",
+            "license": "", "icon_index": 0, "sheet_index": 0, "last_updated": "2024-01-05 at 3:07 (UTC)", "releasenotes": ""}
+    return {"info": info, "Install": [{"type": "mkdir", "directory": "sdmc:/a"}]}
+
+def unistore_text() -> str:
+    return json.dumps({"storeInfo": STORE_INFO, "storeContent": [entry("one"), entry("two")]}, indent=4)
+
+class ValidateTest(unittest.TestCase):
+    def validate_text(self, text: str) -> list[tuple[str, str]]:
+        with tempfile.TemporaryDirectory() as temp:
+            path = Path(temp).joinpath("t.unistore")
+            path.write_text(text, encoding="utf-8")
+            return validate(path, None)
+
+    def assertSyntaxError(self, text: str):
+        with self.assertRaises(ValueError):
+            json.loads(text)
+        results = self.validate_text(text)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], "error")
+        self.assertIn("not a valid unistore file", results[0][1])
+
+    def test_valid(self):
+        self.assertEqual(self.validate_text(unistore_text()), [])
+
+    def test_missing_comma_between_entries(self):
+        self.assertSyntaxError(unistore_text().replace("},\n        {", "}\n        {", 1))
+
+    def test_missing_comma_between_members(self):
+        self.assertSyntaxError(unistore_text().replace("},\n    \"storeContent\"", "}\n    \"storeContent\"", 1))
+
+    def test_missing_comma_inside_entry(self):
+        self.assertSyntaxError(unistore_text().replace("},\n            \"Install\"", "}\n            \"Install\"", 1))
+
+    def test_trailing_comma(self):
+        self.assertSyntaxError(unistore_text().replace("}\n    ]\n}", "},\n    ]\n}", 1))
+
+    def test_trailing_garbage(self):
+        self.assertSyntaxError(unistore_text() + "\ngarbage")
+
+    def test_trailing_whitespace(self):
+        self.assertEqual(self.validate_text(unistore_text() + "\n\n"), [])
+
+    def test_duplicate_scripts(self):
+        text = unistore_text().replace("\"Install\": [", "\"Install\": [], \"Install\": [", 1)
+        results = self.validate_text(text)
+        self.assertEqual(len(results), 1)
+        self.assertIn("duplicate script names Install", results[0][1])
+
+class EntryDictTest(unittest.TestCase):
+    def test_duplicates_per_entry(self):
+        first, second = EntryDict(), EntryDict()
+        first.duplicates.append(("Install", []))
+        self.assertEqual(second.duplicates, [])
+
+if __name__ == "__main__":
+    unittest.main()
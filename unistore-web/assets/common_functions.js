@@ -17,4 +17,55 @@ function formatText(text) {
     });
 
     return parsedText;
-}
\ No newline at end of file
+}
+
+// mods-indexes/bundle.json is written by utils/buildSite.py --bundle, it holds
+// every index and the listing fields of every mod. Pages fall back to one
+// request per mod when it's missing
+var modsBundle = undefined;
+
+async function loadModsBundle() {
+    if (modsBundle === undefined) {
+        try {
+            const response = await fetch("assets/mods-indexes/bundle.json");
+            modsBundle = response.ok ? await response.json() : null;
+        } catch (error) {
+            modsBundle = null;
+        }
+    }
+    return modsBundle;
+}
+
+async function fetchModIndex(name) {
+    const bundle = await loadModsBundle();
+    if (bundle && bundle.indexes[name]) {
+        return bundle.indexes[name];
+    }
+    const response = await fetch("assets/mods-indexes/" + name + ".json");
+    if (!response.ok) {
+        throw new Error('Network response was not ok ' + response.statusText);
+    }
+    return response.json();
+}
+
+async function fetchModListing(mod) {
+    const bundle = await loadModsBundle();
+    if (bundle && bundle.mods[mod]) {
+        return bundle.mods[mod];
+    }
+    const response = await fetch("assets/mods-info/" + mod + ".json");
+    if (!response.ok) {
+        throw new Error('Network response was not ok ' + response.statusText);
+    }
+    return response.json();
+}
+// modThumbnail is a smaller variant of modBanner made by
+// utils/optimizeScreenshots.py, narrow screens download that one. The
+// widths are those of the files, a listing without them only gets src
+function setListingImage(img, listing) {
+    img.src = listing.modBanner;
+    if (listing.modThumbnail && listing.modThumbnail !== listing.modBanner && listing.modThumbnailWidth && listing.modBannerWidth) {
+        img.srcset = `${listing.modThumbnail} ${listing.modThumbnailWidth}w, ${listing.modBanner} ${listing.modBannerWidth}w`;
+        img.sizes = "(max-width: 480px) 200px, 400px";
+    }
+}
@@ -1,24 +1,12 @@
 async function loadFeatureMods() {
-    const jsonFeaturedIndexPath = "assets/mods-indexes/featured_mods.json";
-
     try {
-        const response = await fetch(jsonFeaturedIndexPath);
-        if (!response.ok) {
-            throw new Error('Network response was not ok ' + response.statusText);
-        }
-        const data = await response.json();
+        const data = await fetchModIndex("featured_mods");
         const featuredMods = data.featured_mods;
         const featuredModsContainer = document.getElementById("featured-mods");
 
         for (const mod of featuredMods) {
-            const jsonModFilePath = "assets/mods-info/" + mod + ".json";
-
             try {
-                const response2 = await fetch(jsonModFilePath);
-                if (!response2.ok) {
-                    throw new Error('Network response was not ok ' + response2.statusText);
-                }
-                const data2 = await response2.json();
+                const data2 = await fetchModListing(mod);
 
                 const entryContainer = document.createElement("div");
                 entryContainer.className = "contenedor";
@@ -26,7 +14,7 @@ async function loadFeatureMods() {
                 const modInfoContainer = document.createElement("div");
 
                 const imgModBanner = document.createElement("img");
-                imgModBanner.src = data2.modBanner;
+                setListingImage(imgModBanner, data2);
                 imgModBanner.className = "imagen-centrada";
                 imgContainer.appendChild(imgModBanner);
 
@@ -1,14 +1,8 @@
 async function loadPageMods() {
     const param = getParam(window.location.href, "type");
     if (param) {
-        const jsonPagePath = "assets/mods-indexes/" + param + ".json";
-
         try {
-            const response = await fetch(jsonPagePath);
-            if (!response.ok) {
-                throw new Error('Network response was not ok ' + response.statusText);
-            }
-            const data = await response.json();
+            const data = await fetchModIndex(param);
             document.title = `${data.title} - STB's MC3DS Mods`;
             document.getElementById("page-type").textContent = data.title;
             document.getElementById("banner").style.backgroundImage = `url(${data.banner})`;
@@ -17,14 +11,8 @@ async function loadPageMods() {
             const modsList = data.mods;
 
             for (const mod of modsList) {
-                const jsonModFilePath = "assets/mods-info/" + mod + ".json";
-    
                 try {
-                    const response2 = await fetch(jsonModFilePath);
-                    if (!response2.ok) {
-                        throw new Error('Network response was not ok ' + response2.statusText);
-                    }
-                    const data2 = await response2.json();
+                    const data2 = await fetchModListing(mod);
     
                     const entryContainer = document.createElement("div");
                     entryContainer.className = "contenedor";
@@ -32,7 +20,7 @@ async function loadPageMods() {
                     const modInfoContainer = document.createElement("div");
     
                     const imgModBanner = document.createElement("img");
-                    imgModBanner.src = data2.modBanner;
+                    setListingImage(imgModBanner, data2);
                     imgModBanner.className = "imagen-centrada";
                     imgContainer.appendChild(imgModBanner);
     
@@ -0,0 +1,239 @@
+import os, sys, json, time, random, shutil, platform, tempfile, argparse, subprocess
+from pathlib import Path
+
+ROOT_DIR = Path(os.path.realpath(__file__)).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR.joinpath("utils")))
+import store_dates
+import validateUnistore
+from store_core import StoreContent
+
+BLOCK_TEMPLATES = {
+    "downloadFile": {"file": "https://example.com/{name}.7z", "output": "sdmc:/luma/titles/00040000001B8700/romfs/{name}.7z"},
+    "downloadRelease": {"repo": "STBrian/{name}", "file": "{name}.7z", "output": "sdmc:/3ds/{name}.7z", "includePrereleases": False},
+    "extractFile": {"file": "sdmc:/luma/titles/00040000001B8700/romfs/{name}.7z", "input": "atlas/", "output": "sdmc:/luma/titles/00040000001B8700/romfs/atlas/"},
+    "deleteFile": {"file": "sdmc:/luma/titles/00040000001B8700/romfs/{name}.7z"},
+    "rmdir": {"directory": "sdmc:/luma/titles/00040000001B8700/romfs/{name}", "required": False},
+    "promptMessage": {"message": "Installing {name}...", "count": 1},
+}
+
+def timed(func, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best == None else min(best, elapsed)
+    return best
+
+def make_catalog(path: Path, entries: int, rng: random.Random, icon_count: int = 37):
+    content = []
+    for i in range(entries):
+        name = f"mod{i}"
+        info = {
+            "title": f"Synthetic {rng.choice(['Texture', 'Panorama', 'Model', 'Music'])} {i}",
+            "author": rng.choice(["STBUniverse", "Someone", "Another"]),
+            "version": f"v0.{rng.randint(0, 9)}.{rng.randint(0, 9)}",
+            "category": rng.sample(["resource pack", "texture pack", "panorama", "music"], rng.randint(1, 2)),
+            "console": ["3DS"],
+            "description": f"Synthetic entry {i}",
+            "license": "none",
+            "icon_index": rng.randrange(icon_count),
+            "sheet_index": 0,
+            "last_updated": f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02}-{rng.randint(1, 28):02} at {rng.randint(0, 23)}:{rng.randint(0, 59):02} (UTC)",
+            "releasenotes": "Release notes\n" * rng.randint(1, 20),
+        }
+        entry = {"info": info}
+        for region in rng.sample(["(USA)", "(EUR)", "Remove content (USA)", "Remove content (EUR)"], rng.randint(1, 4)):
+            blocks = []
+            for _ in range(rng.randint(1, 20)):
+                block_type = rng.choice(list(BLOCK_TEMPLATES))
+                block = {"type": block_type}
+                for key, value in BLOCK_TEMPLATES[block_type].items():
+                    block[key] = value.format(name=name) if isinstance(value, str) else value
+                blocks.append(block)
+            entry[f"{name} {region}"] = blocks
+        content.append(entry)
+
+    store = {"storeInfo": {"title": "Synthetic", "author": "benchmark", "description": "", "file": path.name, "url": "", "sheet": "", "sheetURL": "", "version": 3, "revision": 1}, "storeContent": content}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=4)
+
+def legacy_sort(store_content: list):
+    store_content = list(store_content)
+    for i in range(len(store_content) - 1):
+        date1 = store_dates.legacyParseDate(store_content[i]["info"]["last_updated"])
+        for j in range(i + 1, len(store_content)):
+            date2 = store_dates.legacyParseDate(store_content[j]["info"]["last_updated"])
+            if date1 <= date2:
+                date1 = date2
+                store_content[i], store_content[j] = store_content[j], store_content[i]
+
+def bench_catalog(workdir: Path, entries: int, rng: random.Random) -> dict:
+    path = workdir.joinpath(f"synthetic-{entries}.unistore")
+    make_catalog(path, entries, rng)
+    results = {"file_bytes": path.stat().st_size}
+
+    results["validate"] = timed(lambda : validateUnistore.validate(path, 37))
+    results["load_full"] = timed(lambda : StoreContent(path))
+    results["load_lazy"] = timed(lambda : StoreContent(path, lazy=True))
+
+    content = StoreContent(path)
+    dates = [content.getInfo(i)["last_updated"] for i in range(entries)]
+    results["parse_date_strptime"] = timed(lambda : [store_dates.legacyParseDate(date) for date in dates])
+
+    def fast_parse():
+        store_dates.parseTimestamp.cache_clear()
+        store_dates.parseTimestamps(dates)
+    results["parse_timestamps_cold"] = timed(fast_parse)
+
+    def indexed_sort():
+        store_dates.parseTimestamp.cache_clear()
+        content.buildSortKeys()
+        content.sortedIndexes("date")
+    results["sort_indexed"] = timed(indexed_sort)
+    if entries <= 1000:
+        results["sort_legacy"] = timed(lambda : legacy_sort(content.storeContent), repeat=1)
+
+    results["serialize_one_dirty"] = timed(lambda : (content.markDirty(0), content.serialize()))
+    content.dirtyEntries.clear()
+    return results
+
+def bench_icons(tiles: int, rng: random.Random) -> dict:
+    # The real per-tile path: store_gui.decodeIcon on the repository icons,
+    # through IconCache the way the grid uses it
+    import store_gui
+    from store_core import getSpritesheetContent
+
+    indexes = [rng.randrange(len(getSpritesheetContent())) for _ in range(tiles)]
+    cache = None
+
+    def cached():
+        nonlocal cache
+        cache = store_gui.IconCache()
+        for index in indexes:
+            cache.get(index, store_gui.ICON_SIZE)
+
+    return {
+        "tiles": tiles,
+        "decode_per_tile": timed(lambda : [store_gui.decodeIcon(index, store_gui.ICON_SIZE) for index in indexes], repeat=1),
+        "icon_cache_get": timed(cached),
+        "icon_cache_stats": cache.stats(),
+    }
+
+def bench_fuse(workdir: Path, pairs: int) -> dict:
+    from PIL import Image
+    import fuse
+
+    def prepare() -> Path:
+        shots_dir = workdir.joinpath("screenshots")
+        shutil.rmtree(shots_dir, ignore_errors=True)
+        shots_dir.mkdir()
+        for i in range(pairs):
+            Image.new("RGB", (400, 240), (i % 256, 0, 0)).save(shots_dir.joinpath(f"shot{i}_top.bmp"))
+            Image.new("RGB", (320, 240), (0, i % 256, 0)).save(shots_dir.joinpath(f"shot{i}_bot.bmp"))
+        return shots_dir
+
+    results = {"pairs": pairs}
+    for name, jobs in (("fuse_serial", 1), ("fuse_parallel", None)):
+        shots_dir = prepare()
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                fuse.fuse_all(shots_dir, "bench", True, jobs)
+            finally:
+                sys.stdout = stdout
+        results[name] = time.perf_counter() - start
+    return results
+
+def bench_panoramas(workdir: Path, textures: int) -> dict:
+    from PIL import Image
+    import py3dst, generatePanoramas
+
+    ui_dir = workdir.joinpath("ui")
+    shutil.rmtree(ui_dir, ignore_errors=True)
+    ui_dir.mkdir()
+    for i in range(textures):
+        Image.new("RGB", (256, 256), (i % 256, 0, 0)).save(ui_dir.joinpath(f"panorama{i}.png"))
+
+    results = {"textures": textures}
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results["encode_full"] = timed(lambda : generatePanoramas.build(ui_dir, force=True), repeat=1)
+            results["encode_unchanged"] = timed(lambda : generatePanoramas.build(ui_dir))
+        finally:
+            sys.stdout = stdout
+    return results
+
+def bench_widgets(blocks: int) -> dict:
+    import customtkinter
+    import store_gui
+
+    root = customtkinter.CTk()
+    root.withdraw()
+    entry = {"info": {}, "script": [{"type": "deleteFile", "file": f"sdmc:/file{i}"} for i in range(blocks)]}
+    view = store_gui.ScriptViewFrame(root, entry, "script")
+    view.grid()
+
+    results = {"blocks": blocks}
+    results["expand"] = timed(lambda : (view.toggleView(), root.update_idletasks()), repeat=1)
+    results["edit_flush"] = timed(lambda : (view.blocks[0].vars["file"].set("sdmc:/edited"), view.binder.flush()))
+    results["insert_block"] = timed(lambda : (view.addBlockSelected("exit", 0), root.update_idletasks()))
+    results["delete_block"] = timed(lambda : (view.blocks[0].deleteBlock(), root.update_idletasks()))
+    root.destroy()
+    return results
+
+def run_stage(results: dict, name: str, func, *args):
+    print(f"Running {name}...", file=sys.stderr)
+    try:
+        results[name] = func(*args)
+    except ImportError as e:
+        results[name] = {"skipped": f"missing dependency: {e.name}"}
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the unistore tooling on synthetic data")
+    arg_parser.add_argument("-s", "--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Catalog sizes to generate")
+    arg_parser.add_argument("-o", "--output", type=Path, help="Write the results as JSON to this file")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--pairs", type=int, default=32, help="Screenshot pairs for the fuse stage")
+    arg_parser.add_argument("--textures", type=int, default=16, help="PNGs for the panorama stage")
+    arg_parser.add_argument("--blocks", type=int, default=60, help="Script blocks for the widget stage")
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "catalogs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for size in args.sizes:
+            print(f"Running catalog with {size} entries...", file=sys.stderr)
+            results["catalogs"][str(size)] = bench_catalog(workdir, size, rng)
+        run_stage(results, "icons", bench_icons, max(args.sizes), rng)
+        run_stage(results, "fuse", bench_fuse, workdir, args.pairs)
+        run_stage(results, "panoramas", bench_panoramas, workdir, args.textures)
+        if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+            run_stage(results, "widgets", bench_widgets, args.blocks)
+        else:
+            results["widgets"] = {"skipped": "no display, run under xvfb-run for the widget stages"}
+
+    text = json.dumps(results, indent=4)
+    if args.output != None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+if __name__ == "__main__":
+    main()
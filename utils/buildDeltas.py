@@ -0,0 +1,243 @@
+import os, sys, re, json, hashlib, tempfile, zipfile, time, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import ROOT_DIR, UNISTORE_FILENAME, StoreContent, localAssetPath
+from store_model import decodeBlock
+from optimizeScripts import remove_steps
+
+PACKS_DIR = ROOT_DIR.joinpath("assets/texture_packs")
+ARCHIVE_DIR = PACKS_DIR.joinpath("archive")
+DELTAS_DIR = PACKS_DIR.joinpath("deltas")
+MANIFEST_NAME = ".delta-manifest.json"
+ARCHIVE_PATTERN = re.compile(r"^(?P<pack>.+?)[-_](?P<version>v\d+(?:\.\d+)*)\.(?:7z|zip)$")
+UPGRADE_NAME = "{script} (upgrade from {version})"
+
+def parse_archive(path: Path) -> tuple[str, str] | None:
+    # Vanilla-1.20_v0.2.1.7z -> ("Vanilla-1.20", "v0.2.1")
+    match = ARCHIVE_PATTERN.match(path.name)
+    return (match["pack"], match["version"]) if match else None
+
+def version_key(version: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in version[1:].split("."))
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def read_archive(path: Path) -> dict[str, bytes]:
+    # Archive member -> content, directories left out
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path) as archive:
+            return {name: archive.read(name) for name in archive.namelist() if not name.endswith("/")}
+    try:
+        import py7zr
+    except ImportError:
+        sys.exit(f"py7zr is needed to read {path.name} (pip install py7zr)")
+    with tempfile.TemporaryDirectory() as temp:
+        with py7zr.SevenZipFile(path, "r") as archive:
+            archive.extractall(path=temp)
+        files = {}
+        for member in Path(temp).rglob("*"):
+            if member.is_file():
+                files[member.relative_to(temp).as_posix()] = member.read_bytes()
+        return files
+
+def write_archive(path: Path, files: dict[str, bytes]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(path.name + ".tmp")
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(temp, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+            for name, data in sorted(files.items()):
+                archive.writestr(name, data)
+    else:
+        import py7zr
+        with tempfile.TemporaryDirectory() as staging, py7zr.SevenZipFile(temp, "w") as archive:
+            for name, data in sorted(files.items()):
+                member = Path(staging).joinpath(name)
+                member.parent.mkdir(parents=True, exist_ok=True)
+                member.write_bytes(data)
+                archive.write(member, name)
+    temp.replace(path)
+
+def diff_archives(old: dict[str, bytes], new: dict[str, bytes]) -> tuple[dict[str, bytes], list[str]]:
+    changed = {name: data for name, data in new.items() if old.get(name) != data}
+    removed = sorted(name for name in old if not name in new)
+    return changed, removed
+
+def load_manifest() -> dict:
+    try:
+        with open(DELTAS_DIR.joinpath(MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def build_delta(old: Path, new: Path, manifest: dict, force: bool) -> dict:
+    # Returns the manifest record: input hashes, changed and removed members.
+    # The archives themselves are only read when the inputs changed
+    old_version, new_version = parse_archive(old)[1], parse_archive(new)[1]
+    delta = DELTAS_DIR.joinpath(f"{parse_archive(new)[0]}_{old_version}-{new_version}{new.suffix}")
+    inputs = [hash_file(old), hash_file(new)]
+    record = manifest.get(delta.name)
+    if not force and record != None and record.get("inputs") == inputs and (delta.exists() or not record["changed"]):
+        return record
+
+    start = time.perf_counter()
+    changed, removed = diff_archives(read_archive(old), read_archive(new))
+    if changed:
+        write_archive(delta, changed)
+        print(f"{delta.name}: {len(changed)} changed, {len(removed)} removed in {time.perf_counter() - start:.2f} s")
+    elif delta.exists():
+        delta.unlink()
+    return {"file": delta.name, "inputs": inputs, "changed": sorted(changed), "removed": removed}
+
+def member_target(name: str, source: str, target: str) -> str | None:
+    # Where an extractFile block puts an archive member, its input is a
+    # folder prefix ("atlas/") or a single member
+    if source.endswith("/"):
+        return target + name[len(source):] if name.startswith(source) else None
+    return target if name == source else None
+
+def insert_steps(blocks: list, after: int, steps: list):
+    # promptMessage/skip counts spanning the step they follow grow with them
+    for j in range(after):
+        block = blocks[j]
+        if block.get("type") in ("promptMessage", "skip") and isinstance(block.get("count"), int) and j < after <= j + block["count"]:
+            block["count"] += len(steps)
+    blocks[after + 1:after + 1] = steps
+
+def upgrade_script(blocks: list, download_url: str, delta_url: str, record: dict) -> list | None:
+    # The install script with the delta downloaded instead, extracts that
+    # get nothing from it dropped and removed members deleted from the SD card.
+    # Without changed members there is no delta, its download, extracts and
+    # removal are dropped too. None when the script installs none of the changes
+    download_output = None
+    script = []
+    extracts = []
+    dropped = []
+    installs = 0
+    # The deletes go after the last extract of the download, or where the
+    # download was when nothing is extracted
+    anchor = None
+    for block in blocks:
+        block_type = block.get("type")
+        from_download = download_output != None and block.get("file") == download_output
+        if block_type == "downloadFile" and block.get("file") == download_url:
+            download_output = block.get("output")
+            block = dict(block.items(), file=delta_url)
+            anchor = len(script)
+            if not record["changed"]:
+                dropped.append(len(script))
+        elif block_type == "extractFile" and from_download:
+            extracts.append((block.get("input", ""), block.get("output", "")))
+            anchor = len(script)
+            if any(member_target(name, block.get("input", ""), "") != None for name in record["changed"]):
+                installs += 1
+            else:
+                dropped.append(len(script))
+        elif block_type == "deleteFile" and from_download and not record["changed"]:
+            dropped.append(len(script))
+        script.append(decodeBlock(dict(block.items())))
+
+    deletes = []
+    for name in record["removed"]:
+        targets = [member_target(name, source, target) for source, target in extracts]
+        deletes += [decodeBlock({"type": "deleteFile", "file": target}) for target in targets if target != None]
+    if not deletes and not installs:
+        return None
+    insert_steps(script, anchor, deletes)
+    remove_steps(script, [i if i <= anchor else i + len(deletes) for i in dropped])
+    return script
+
+def update_entry(entry, download_url: str, upgrades: list[tuple[str, str, dict]]) -> bool:
+    # Regenerates the upgrade scripts of every script downloading download_url,
+    # each placed right after the script it was made from
+    bases = [name for name, blocks in entry.scripts.items() if isinstance(blocks, list)
+             and any(block.get("type") == "downloadFile" and block.get("file") == download_url for block in blocks)]
+    generated = tuple(UPGRADE_NAME.format(script=base, version="")[:-1] for base in bases)
+    scripts = {}
+    for name, blocks in entry.scripts.items():
+        if name.startswith(generated):
+            continue
+        scripts[name] = blocks
+        if not name in bases:
+            continue
+        for version, delta_url, record in upgrades:
+            script = upgrade_script(blocks, download_url, delta_url, record)
+            if script != None:
+                scripts[UPGRADE_NAME.format(script=name, version=version)] = script
+    changed = list(scripts.items()) != list(entry.scripts.items()) if bases else False
+    entry.scripts = scripts
+    return changed
+
+def download_urls(entry, store_info: dict) -> set[str]:
+    # Published pack archives the entry installs
+    urls = set()
+    for name, blocks in entry.items():
+        if name == "info" or not isinstance(blocks, list):
+            continue
+        for block in blocks:
+            path = localAssetPath(block.get("file"), store_info) if block.get("type") == "downloadFile" else None
+            if path != None and path.parent == PACKS_DIR and parse_archive(path) != None:
+                urls.add(block["file"])
+    return urls
+
+def build(unistore_path: Path, write: bool = False, force: bool = False, max_upgrades: int | None = None) -> int:
+    start = time.perf_counter()
+    content = StoreContent(unistore_path)
+    base_url = content.storeInfo.get("url", "").rsplit("/", 1)[0]
+    manifest = load_manifest()
+    new_manifest = {}
+    for idx in range(len(content.storeContent)):
+        entry = content.getEntry(idx)
+        entry_changed = False
+        for download_url in sorted(download_urls(entry, content.storeInfo)):
+            latest = localAssetPath(download_url, content.storeInfo)
+            pack, latest_version = parse_archive(latest)
+            older = []
+            for archive in ARCHIVE_DIR.glob(f"{pack}*"):
+                parsed = parse_archive(archive)
+                if parsed == None or parsed[0] != pack:
+                    continue
+                if version_key(parsed[1]) >= version_key(latest_version):
+                    print(f"Skipping {archive.name}, it isn't older than the published {latest.name}", file=sys.stderr)
+                    continue
+                older.append((version_key(parsed[1]), parsed[1], archive))
+            older.sort(reverse=True)
+
+            upgrades = []
+            for _, version, archive in older[:max_upgrades]:
+                record = build_delta(archive, latest, manifest, force)
+                new_manifest[record["file"]] = record
+                if not record["changed"] and not record["removed"]:
+                    continue
+                delta = DELTAS_DIR.joinpath(record["file"])
+                delta_size = delta.stat().st_size if delta.exists() else 0
+                print(f"{entry['info']['title']} {version} -> {latest_version}: {latest.stat().st_size:,} -> {delta_size:,} bytes")
+                upgrades.append((version, f"{base_url}/{delta.relative_to(ROOT_DIR).as_posix()}", record))
+            entry_changed = update_entry(entry, download_url, upgrades) or entry_changed
+        if entry_changed and write:
+            content.markDirty(idx)
+
+    # Deltas no entry needs anymore
+    for name in manifest:
+        if not name in new_manifest and DELTAS_DIR.joinpath(name).exists():
+            DELTAS_DIR.joinpath(name).unlink()
+            print(f"Removed {name}")
+    if new_manifest:
+        DELTAS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(DELTAS_DIR.joinpath(MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(new_manifest, f, indent=4, sort_keys=True)
+    if write and content.save():
+        print(f"Saved {unistore_path.name}")
+    print(f"{len(new_manifest)} deltas in {time.perf_counter() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Package the textures changed since each archived pack version and add \"upgrade from\" install scripts")
+    arg_parser.add_argument("unistore", type=Path, nargs="?", default=UNISTORE_FILENAME, help="Unistore whose entries get the upgrade scripts")
+    arg_parser.add_argument("-w", "--write", action="store_true", help="Save the upgrade scripts to the unistore, otherwise only build the deltas")
+    arg_parser.add_argument("-f", "--force", action="store_true", help="Rebuild every delta, ignoring the manifest")
+    arg_parser.add_argument("-n", "--max-upgrades", type=int, default=None, help="Only make upgrades from the newest N archived versions")
+    args = arg_parser.parse_args()
+    sys.exit(build(args.unistore, args.write, args.force, args.max_upgrades))
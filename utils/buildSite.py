@@ -0,0 +1,163 @@
+import os, sys, json, re, hashlib, time, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import ROOT_DIR, ICONS_DIR, UNISTORE_FILENAME, StoreContent, getSpritesheetContent, localAssetPath
+from optimizeScreenshots import OUTPUT_DIR as SCREENSHOT_VARIANTS_DIR, ScreenshotVariants
+
+MANIFEST_NAME = ".site-manifest.json"
+FEATURED_INDEX = "featured_mods"
+BUNDLE_NAME = "bundle"
+
+# Unistore category -> (index file, page title)
+CATEGORY_INDEXES = {
+    "resource pack": ("resource_packs", "Resource Packs"),
+    "texture pack": ("texture_packs", "Texture Packs"),
+    "panorama": ("panoramas", "Panoramas"),
+    "sound pack": ("sound_packs", "Sound Packs"),
+    "misc": ("misc", "Misc"),
+}
+
+# What listing pages show, the rest stays in mods-info
+LISTING_FIELDS = ("packType", "modTitle", "modVersion", "modShortDescription", "modIcon", "modBanner", "modBannerWidth", "modThumbnail", "modThumbnailWidth")
+
+def mod_slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower().replace("'", "")).strip("-")
+
+def category_index(category: str) -> tuple[str, str]:
+    return CATEGORY_INDEXES.get(category, (category.replace(" ", "_"), category.title()))
+
+def download_link(entry) -> str:
+    for name, blocks in entry.items():
+        if name == "info" or not isinstance(blocks, list):
+            continue
+        for block in blocks:
+            if block.get("type") == "downloadFile":
+                return block.get("file", "")
+    return ""
+
+def screenshot_url(url: str, store_info: dict, variants: ScreenshotVariants | None, use: str) -> str:
+    # The smallest encoded variant when optimizeScreenshots.py has made one
+    best = variants.best(url, store_info, use) if variants != None else None
+    return variants.url(best, store_info) if best != None else url
+
+def mod_info(entry, store_info: dict, variants: ScreenshotVariants | None = None) -> dict:
+    raw_url = store_info.get("url", "").rsplit("/", 1)[0]
+    info = entry["info"]
+    icons = getSpritesheetContent()
+    icon_index = info.get("icon_index")
+    icon = f"{raw_url}/{ICONS_DIR.relative_to(ROOT_DIR).as_posix()}/{icons[icon_index]}" if isinstance(icon_index, int) and 0 <= icon_index < len(icons) else ""
+    urls = [screenshot["url"] for screenshot in info.get("screenshots", []) if isinstance(screenshot, dict) and "url" in screenshot]
+    screenshots = [screenshot_url(url, store_info, variants, "web") for url in urls]
+    thumbnail = screenshot_url(urls[0], store_info, variants, "thumbnail") if urls else ""
+    # The srcset w descriptors, read from the files when there is a thumbnail
+    banner_path = localAssetPath(screenshots[0], store_info) if thumbnail else None
+    thumbnail_path = localAssetPath(thumbnail, store_info) if thumbnail else None
+    widths = (variants.width(banner_path), variants.width(thumbnail_path)) if banner_path != None and thumbnail_path != None else (None, None)
+    categories = info.get("category", [])
+    return {
+        "packType": category_index(categories[0])[0].removesuffix("s") if categories else "",
+        "modTitle": info["title"],
+        "modVersion": info["version"],
+        "modShortDescription": info["description"],
+        "modDescription": info.get("releasenotes", ""),
+        "modIcon": icon,
+        "modBanner": screenshots[0] if screenshots else icon,
+        "modBannerWidth": widths[0],
+        # Same as modBanner when there is no smaller variant
+        "modThumbnail": thumbnail or (screenshots[0] if screenshots else icon),
+        "modThumbnailWidth": widths[1],
+        "downloadLink": download_link(entry),
+        "screenshots": screenshots,
+    }
+
+def generate(content: StoreContent, featured: list[str], bundle: bool, variants: ScreenshotVariants | None = None) -> dict[str, str]:
+    # Relative path -> file text, formatted like the hand-written files were
+    files = {}
+    mods = {}
+    indexes = {}
+    for idx in content.sortedIndexes("date"):
+        entry = content.getEntry(idx)
+        slug = mod_slug(entry["info"]["title"])
+        if slug in mods:
+            print(f"Skipping {entry['info']['title']!r}, {slug} is already used by another entry", file=sys.stderr)
+            continue
+        mods[slug] = mod_info(entry, content.storeInfo, variants)
+        files[f"mods-info/{slug}.json"] = json.dumps(mods[slug], indent=4)
+        for category in entry["info"].get("category", []):
+            name, title = category_index(category)
+            index = indexes.setdefault(name, {"title": title, "banner": mods[slug]["modBanner"], "mods": []})
+            index["mods"].append(slug)
+
+    for name, index in indexes.items():
+        files[f"mods-indexes/{name}.json"] = json.dumps(index, indent=4)
+
+    missing = [slug for slug in featured if not slug in mods]
+    if missing:
+        print(f"Featured mods not in the unistore: {', '.join(missing)}", file=sys.stderr)
+
+    if bundle:
+        indexes[FEATURED_INDEX] = {FEATURED_INDEX: [slug for slug in featured if slug in mods]}
+        listing = {slug: {field: mod[field] for field in LISTING_FIELDS} for slug, mod in mods.items()}
+        files[f"mods-indexes/{BUNDLE_NAME}.json"] = json.dumps({"indexes": indexes, "mods": listing}, separators=(",", ":"))
+    return files
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def hash_file(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def build(unistore_path: Path, site_assets: Path, bundle: bool = False) -> int:
+    start = time.perf_counter()
+    content = StoreContent(unistore_path)
+    with open(site_assets.joinpath(f"mods-indexes/{FEATURED_INDEX}.json"), "r", encoding="utf-8") as f:
+        featured = json.load(f).get(FEATURED_INDEX, [])
+
+    manifest_path = site_assets.joinpath(MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    variants = ScreenshotVariants.scan() if SCREENSHOT_VARIANTS_DIR.exists() else None
+    files = generate(content, featured, bundle, variants)
+    new_manifest = {}
+    written = 0
+    for name, text in files.items():
+        digest = new_manifest[name] = hash_text(text)
+        path = site_assets.joinpath(name)
+        # Without a manifest entry the file on disk is hashed instead
+        if path.exists() and (manifest.get(name) == digest or hash_file(path) == digest):
+            continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        print(f"Wrote {name}")
+        written += 1
+
+    # Only files this script generated before are ever removed
+    removed = 0
+    for name in manifest:
+        if not name in files and site_assets.joinpath(name).exists():
+            site_assets.joinpath(name).unlink()
+            print(f"Removed {name}")
+            removed += 1
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=4, sort_keys=True)
+    print(f"{len(files)} files, {written} written, {removed} removed in {time.perf_counter() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Generate the unistore-web mods-info and mods-indexes JSON from the unistore")
+    arg_parser.add_argument("--unistore", type=Path, default=UNISTORE_FILENAME, help="Unistore to read the mods from")
+    arg_parser.add_argument("--site", type=Path, default=ROOT_DIR.joinpath("unistore-web/assets"), help="Site assets directory")
+    arg_parser.add_argument("--bundle", action="store_true", help=f"Also write mods-indexes/{BUNDLE_NAME}.json so listing pages need one request")
+    args = arg_parser.parse_args()
+    sys.exit(build(args.unistore, args.site, args.bundle))
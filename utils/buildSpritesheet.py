@@ -0,0 +1,62 @@
+import os, sys, json, hashlib, shlex, subprocess, time, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import ROOT_DIR, StoreContent, readSpritesheet, checkSpriteIndexes
+
+MANIFEST_NAME = ".spritesheet-manifest.json"
+
+def hash_inputs(t3s_path: Path, icons: list[str]) -> dict:
+    hashes = {}
+    for name in [t3s_path.name] + icons:
+        with open(t3s_path.parent.joinpath(name), "rb") as f:
+            hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return hashes
+
+def check_indexes(unistore_path: Path, icon_count: int) -> list[str]:
+    content = StoreContent(unistore_path, lazy=True)
+    infos = [content.getInfo(i) for i in range(len(content.storeContent))]
+    return checkSpriteIndexes(content.storeInfo, infos, icon_count)
+
+def build(t3s_path: Path, output: Path, unistore_path: Path, tex3ds: str, force: bool = False) -> int:
+    start = time.perf_counter()
+    icons = readSpritesheet(t3s_path)
+
+    errors = check_indexes(unistore_path, len(icons))
+    for error in errors:
+        print(error, file=sys.stderr)
+    if errors:
+        return 1
+
+    manifest_path = t3s_path.parent.joinpath(MANIFEST_NAME)
+    hashes = hash_inputs(t3s_path, icons)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    if not force and output.exists() and manifest.get("output") == output.name and manifest.get("inputs") == hashes:
+        print(f"{output.name} is up to date ({len(icons)} icons, {time.perf_counter() - start:.3f} s)")
+        return 0
+
+    command = shlex.split(tex3ds) + ["-i", str(t3s_path), "-o", str(output)]
+    result = subprocess.run(command, cwd=t3s_path.parent)
+    if result.returncode != 0:
+        print(f"tex3ds failed with code {result.returncode}", file=sys.stderr)
+        return result.returncode
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"output": output.name, "inputs": hashes}, f, indent=4)
+    print(f"Built {output.name} from {len(icons)} icons in {time.perf_counter() - start:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Rebuild spritesheet.t3x when the icons listed in spritesheet.t3s change")
+    arg_parser.add_argument("--t3s", type=Path, default=ROOT_DIR.joinpath("assets/icons/spritesheet.t3s"), help="Spritesheet description file")
+    arg_parser.add_argument("--output", type=Path, default=ROOT_DIR.joinpath("spritesheet.t3x"), help="Built atlas")
+    arg_parser.add_argument("--unistore", type=Path, default=ROOT_DIR.joinpath("stb-mc3ds.unistore"), help="Unistore whose icon/sheet indexes are checked")
+    arg_parser.add_argument("--tex3ds", default=os.environ.get("TEX3DS", "tex3ds"), help="tex3ds command (default: $TEX3DS or tex3ds)")
+    arg_parser.add_argument("-f", "--force", action="store_true", help="Rebuild even if nothing changed")
+    args = arg_parser.parse_args()
+    sys.exit(build(args.t3s.resolve(), args.output.resolve(), args.unistore, args.tex3ds, args.force))
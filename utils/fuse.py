@@ -1,49 +1,88 @@
-import os, math, glob
+import os, sys, math, glob, time, argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from PIL import Image
 
-os.chdir(Path(os.path.realpath(__file__)).parent)
+def find_pairs(root: Path) -> list[tuple[Path, Path]]:
+    pairs = []
+    for file in sorted(glob.glob("**/*_top.bmp", root_dir=root, recursive=True)):
+        filepath_sup = root.joinpath(file)
+        filepath_inf = filepath_sup.with_name(f"{filepath_sup.stem[:-4]}_bot.bmp")
+        if filepath_inf.exists():
+            pairs.append((filepath_sup, filepath_inf))
+    return pairs
 
-export_name = input("Introduce el nombre con el que se exportarán las imágenes: ")
-while True:
-    try:
-        icons = input("Make icons? [y/n]")
-        if icons in ["y", "n"] or icons in ["Y", "N"]:
-            break
-        else:
-            print("Invalid option")
-    except:
-        print("Invalid option")
+def fuse_pair(filepath_sup: Path, filepath_inf: Path, export_name: str, i: int, icons: bool, remove: bool = True) -> tuple[str, float]:
+    start = time.perf_counter()
+
+    img_sup = Image.open(filepath_sup)
+    img_inf = Image.open(filepath_inf)
+
+    imgs_w, imgs_h = img_sup.size
+    if icons:
+        img_sup_crop = img_sup.crop((math.floor(((imgs_w)/2)-(imgs_h/2)), 0, math.floor(((imgs_w)/2)+(imgs_h/2)), imgs_h))
+
+        icon = img_sup_crop.resize((48, 48), Image.Resampling.LANCZOS)
+        icon.save(os.path.join(filepath_sup.parent, f"{export_name}{i}_icon.png"))
 
-i = 0
-for file in glob.iglob("**/*.bmp", recursive=True):
-    if os.path.exists(file) and (file[-8:] == "_top.bmp" or file[-8:] == "_bot.bmp"):
-        filepath = Path(file)
-        name = filepath.stem
-        name = name[:-4]
-        
-        filepath_sup = Path(os.path.join(filepath.parent, f"{name}_top.bmp"))
-        filepath_inf = Path(os.path.join(filepath.parent, f"{name}_bot.bmp"))
+    imgi_w, imgi_h = img_inf.size
 
-        img_sup = Image.open(filepath_sup)
-        img_inf = Image.open(filepath_inf)
+    fused_img = Image.new('RGBA', (imgs_w, (imgs_h+imgi_h)))
+    fused_img_w, fused_img_h = fused_img.size
+    fused_img.paste(img_sup, (0, 0))
+    fused_img.paste(img_inf, (math.floor((fused_img_w/2)-(imgi_w/2)), math.floor(fused_img_h/2)))
 
-        imgs_w, imgs_h = img_sup.size
-        if icons in ["y", "Y"]:
-            img_sup_crop = img_sup.crop((math.floor(((imgs_w)/2)-(imgs_h/2)), 0, math.floor(((imgs_w)/2)+(imgs_h/2)), imgs_h))
+    fused_path = os.path.join(filepath_sup.parent, f"{export_name}{i}_fused.png")
+    fused_img.save(fused_path)
 
-            icon = img_sup_crop.resize((48, 48), Image.Resampling.LANCZOS)
-            icon.save(os.path.join(filepath.parent, f"{export_name}{i}_icon.png"))
+    img_sup.close()
+    img_inf.close()
+    if remove:
+        os.remove(filepath_sup)
+        os.remove(filepath_inf)
+    return fused_path, time.perf_counter() - start
 
-        imgi_w, imgi_h = img_inf.size
+def fuse_all(root: Path, export_name: str, icons: bool, workers: int | None = None, remove: bool = True):
+    pairs = find_pairs(root)
+    if not pairs:
+        print("No _top/_bot pairs found")
+        return
 
-        fused_img = Image.new('RGBA', (imgs_w, (imgs_h+imgi_h)))
-        fused_img_w, fused_img_h = fused_img.size
-        fused_img.paste(img_sup, (0, 0))
-        fused_img.paste(img_inf, (math.floor((fused_img_w/2)-(imgi_w/2)), math.floor(fused_img_h/2)))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fuse_pair, sup, inf, export_name, i, icons, remove) for i, (sup, inf) in enumerate(pairs)]
+        for future in futures:
+            fused_path, seconds = future.result()
+            print(f"{fused_path}: {seconds * 1000:.1f} ms")
+    total = time.perf_counter() - start
+    print(f"Fused {len(pairs)} pairs in {total:.2f} s ({len(pairs) / total:.1f} pairs/s)")
+
+def interactive():
+    os.chdir(Path(os.path.realpath(__file__)).parent)
+
+    export_name = input("Introduce el nombre con el que se exportarán las imágenes: ")
+    while True:
+        try:
+            icons = input("Make icons? [y/n]")
+            if icons in ["y", "n"] or icons in ["Y", "N"]:
+                break
+            else:
+                print("Invalid option")
+        except:
+            print("Invalid option")
 
-        fused_img.save(os.path.join(filepath.parent, f"{export_name}{i}_fused.png"))
+    for i, (filepath_sup, filepath_inf) in enumerate(find_pairs(Path("."))):
+        fuse_pair(filepath_sup, filepath_inf, export_name, i, icons in ["y", "Y"])
 
-        os.remove(os.path.join(filepath.parent, f"{name}_top.bmp"))
-        os.remove(os.path.join(filepath.parent, f"{name}_bot.bmp"))
-        i += 1
\ No newline at end of file
+if __name__ == "__main__":
+    if len(sys.argv) == 1:
+        interactive()
+    else:
+        arg_parser = argparse.ArgumentParser(description="Fuse 3DS _top/_bot screenshot pairs into single PNGs")
+        arg_parser.add_argument("name", help="Prefix for the exported images")
+        arg_parser.add_argument("directory", nargs="?", default=".", type=Path, help="Directory searched recursively for .bmp pairs")
+        arg_parser.add_argument("-i", "--icons", action="store_true", help="Also export a 48x48 icon from each top screen")
+        arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default: CPU count)")
+        arg_parser.add_argument("-k", "--keep", action="store_true", help="Keep the source .bmp files")
+        args = arg_parser.parse_args()
+        fuse_all(args.directory, args.name, args.icons, args.jobs, not args.keep)
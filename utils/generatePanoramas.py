@@ -1,12 +1,73 @@
-import py3dst
-
-from PIL import Image
+import json, hashlib, time, argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-path = Path("./ui")
+MANIFEST_NAME = ".3dst-manifest.json"
+
+def hash_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_manifest(path: Path) -> dict:
+    try:
+        with open(path.joinpath(MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(path: Path, manifest: dict):
+    with open(path.joinpath(MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+
+def is_up_to_date(element: Path, record: dict | None) -> tuple[bool, dict]:
+    stat = element.stat()
+    if record != None and element.with_suffix(".3dst").exists():
+        # Size and mtime unchanged means nothing to hash
+        if record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime_ns:
+            return True, record
+        digest = hash_file(element)
+        if record.get("sha256") == digest:
+            return True, {"sha256": digest, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+    else:
+        digest = hash_file(element)
+    return False, {"sha256": digest, "size": stat.st_size, "mtime": stat.st_mtime_ns}
 
-for element in path.glob("*.png"):
+def convert(element: Path) -> float:
+    import py3dst
+    from PIL import Image
+
+    start = time.perf_counter()
     image = Image.open(element)
     image = image.resize((128, 128), Image.Resampling.LANCZOS)
     texture = py3dst.Texture3dst().fromImage(image)
-    texture.export(f"{element.parent.joinpath(element.stem)}.3dst")
\ No newline at end of file
+    texture.export(f"{element.parent.joinpath(element.stem)}.3dst")
+    return time.perf_counter() - start
+
+def build(path: Path, force: bool = False, workers: int | None = None):
+    start = time.perf_counter()
+    manifest = {} if force else load_manifest(path)
+    new_manifest = {}
+    pending = []
+    for element in sorted(path.glob("*.png")):
+        up_to_date, record = is_up_to_date(element, manifest.get(element.name))
+        new_manifest[element.name] = record
+        if not up_to_date:
+            pending.append(element)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for element, seconds in zip(pending, executor.map(convert, pending)):
+                print(f"{element.stem}.3dst: {seconds * 1000:.1f} ms")
+
+    if new_manifest != manifest:
+        save_manifest(path, new_manifest)
+    total = time.perf_counter() - start
+    print(f"Converted {len(pending)} of {len(new_manifest)} textures in {total:.3f} s")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Convert panorama PNGs to 128x128 .3dst textures")
+    arg_parser.add_argument("directory", nargs="?", default="./ui", type=Path, help="Directory with the panorama PNGs")
+    arg_parser.add_argument("-f", "--force", action="store_true", help="Convert every texture, ignoring the manifest")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    args = arg_parser.parse_args()
+    build(args.directory, args.force, args.jobs)
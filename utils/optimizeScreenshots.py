@@ -0,0 +1,207 @@
+import os, sys, re, hashlib, time, argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import ROOT_DIR, UNISTORE_FILENAME, StoreContent, localAssetPath
+
+SOURCE_DIR = ROOT_DIR.joinpath("assets/screenshots")
+OUTPUT_DIR = ROOT_DIR.joinpath("assets/optimized_screenshots")
+
+# Variant name -> (file extension, Pillow save options, width or None for
+# the original size). Scaled variants keep the aspect ratio. The options are
+# part of the content hash, so changing them re-encodes everything once
+VARIANTS = {
+    "png": (".png", {"format": "PNG", "optimize": True}, None),
+    "webp": (".webp", {"format": "WEBP", "lossless": True, "method": 6}, None),
+    "webp-lossy": (".lossy.webp", {"format": "WEBP", "quality": 90, "method": 6}, None),
+    "thumb": (".thumb.webp", {"format": "WEBP", "quality": 80, "method": 6}, 200),
+}
+# Where an image is used -> variants that are good enough there. Universal
+# Updater only decodes PNG and shows screenshots at their full size
+USES = {
+    "unistore": ("png",),
+    "web": ("png", "webp", "webp-lossy"),
+    "thumbnail": ("thumb",),
+}
+# <stem>.<hash><ext> of a variant, also of one made from an older version of
+# the screenshot
+VARIANT_NAME = re.compile(r"^(?P<stem>.+)\.[0-9a-f]{12}(?P<ext>" + "|".join(re.escape(ext) for ext, _, _ in VARIANTS.values()) + r")$")
+
+def source_hash(path: Path) -> str:
+    digest = hashlib.sha256(repr(sorted(VARIANTS.items())).encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+def variant_paths(source: Path, digest: str) -> dict[str, Path]:
+    # <subdir>/<stem>.<hash><ext>, a changed screenshot gets new URLs
+    base = OUTPUT_DIR.joinpath(source.relative_to(SOURCE_DIR).parent, f"{source.stem}.{digest}")
+    return {name: base.with_name(base.name + ext) for name, (ext, _, _) in VARIANTS.items()}
+
+def encode(source: Path, outputs: dict[str, Path]) -> float:
+    from PIL import Image
+
+    start = time.perf_counter()
+    with Image.open(source) as image:
+        image.load()
+        for name, output in outputs.items():
+            _, options, width = VARIANTS[name]
+            variant = image
+            if width != None and image.width > width:
+                variant = image.resize((width, max(1, round(image.height * width / image.width))), Image.Resampling.LANCZOS)
+            output.parent.mkdir(parents=True, exist_ok=True)
+            # Written next to the target first, an interrupted run leaves no half file
+            temp = output.with_name(output.name + ".tmp")
+            variant.save(temp, **options)
+            temp.replace(output)
+    return time.perf_counter() - start
+
+class ScreenshotVariants:
+    # Source screenshot -> its variant files, also resolves URLs that already
+    # point at a variant back to their source
+    def __init__(self, variants: dict[Path, dict[str, Path]]):
+        self.variants = variants
+        self.sources = {path: source for source, paths in variants.items() for path in paths.values()}
+
+    @classmethod
+    def scan(cls) -> "ScreenshotVariants":
+        return cls({source: variant_paths(source, source_hash(source)) for source in sorted(SOURCE_DIR.rglob("*.png"))})
+
+    def source(self, url, store_info: dict) -> Path | None:
+        path = localAssetPath(url, store_info)
+        if path == None:
+            return None
+        if path in self.variants or path in self.sources:
+            return path if path in self.variants else self.sources[path]
+        return self.stale_source(path)
+
+    def stale_source(self, path: Path) -> Path | None:
+        # The screenshot a variant with an outdated hash was made from
+        match = VARIANT_NAME.match(path.name)
+        if match == None or not path.is_relative_to(OUTPUT_DIR):
+            return None
+        source = SOURCE_DIR.joinpath(path.relative_to(OUTPUT_DIR).parent, match["stem"] + ".png")
+        return source if source in self.variants else None
+
+    def best(self, url, store_info: dict, use: str) -> Path | None:
+        # Smallest file that is good enough for the use, the original included
+        # when it qualifies
+        source = self.source(url, store_info)
+        if source == None:
+            return None
+        paths = self.variants[source]
+        candidates = [paths[name] for name in USES[use] if paths[name].exists()]
+        if use != "thumbnail":
+            candidates.append(source)
+        return min(candidates, key=lambda path: path.stat().st_size) if candidates else None
+
+    def width(self, path: Path) -> int:
+        # Only the header is read
+        from PIL import Image
+
+        with Image.open(path) as image:
+            return image.width
+
+    def url(self, path: Path, store_info: dict) -> str:
+        base_url = store_info.get("url", "").rsplit("/", 1)[0]
+        return f"{base_url}/{path.relative_to(ROOT_DIR).as_posix()}"
+
+def build(jobs: int | None = None) -> ScreenshotVariants:
+    start = time.perf_counter()
+    variants = ScreenshotVariants.scan()
+    pending = []
+    for source, paths in variants.variants.items():
+        missing = {name: path for name, path in paths.items() if not path.exists()}
+        if missing:
+            pending.append((source, missing))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(encode, source, missing) for source, missing in pending]
+            for (source, missing), future in zip(pending, futures):
+                print(f"{source.relative_to(SOURCE_DIR).as_posix()}: {len(missing)} variants in {future.result() * 1000:.1f} ms")
+    print(f"Encoded {len(pending)} of {len(variants.variants)} screenshots in {time.perf_counter() - start:.2f} s")
+    return variants
+
+def referenced_paths(content: StoreContent) -> set[Path]:
+    # Local files the screenshot URLs of the unistore point at
+    paths = set()
+    for idx in range(len(content.storeContent)):
+        for screenshot in content.getInfo(idx).get("screenshots", []):
+            path = localAssetPath(screenshot.get("url") if isinstance(screenshot, dict) else None, content.storeInfo)
+            if path != None:
+                paths.add(path)
+    return paths
+
+def remove_stale(variants: ScreenshotVariants, referenced: set[Path]) -> int:
+    # Variants of screenshots that changed or are gone. Those the unistore
+    # still points at are kept until its URLs are rewritten
+    removed = 0
+    kept = []
+    if OUTPUT_DIR.exists():
+        for path in sorted(OUTPUT_DIR.rglob("*")):
+            if not path.is_file() or path in variants.sources:
+                continue
+            if path in referenced:
+                kept.append(path)
+                continue
+            path.unlink()
+            removed += 1
+    for path in kept:
+        print(f"Kept stale {path.relative_to(OUTPUT_DIR).as_posix()}, the unistore still uses it (run with -w to re-point it)", file=sys.stderr)
+    print(f"Removed {removed} stale files")
+    return removed
+
+def rewrite_unistore(content: StoreContent, variants: ScreenshotVariants, write: bool) -> tuple[int, int]:
+    # Points every screenshot at its smallest PNG, returns bytes before and after
+    before = after = 0
+    for idx in range(len(content.storeContent)):
+        info = content.getEntry(idx)["info"]
+        changed = False
+        for screenshot in info.get("screenshots", []):
+            if not isinstance(screenshot, dict):
+                continue
+            current = localAssetPath(screenshot.get("url"), content.storeInfo)
+            best = variants.best(screenshot.get("url"), content.storeInfo, "unistore")
+            if current == None or best == None:
+                continue
+            before += current.stat().st_size
+            after += best.stat().st_size
+            if best != current and write:
+                screenshot["url"] = variants.url(best, content.storeInfo)
+                changed = True
+        if changed:
+            content.markDirty(idx)
+    return before, after
+
+def web_savings(content: StoreContent, variants: ScreenshotVariants) -> tuple[int, int]:
+    # Bytes the site pages download for the screenshots, originals vs variants
+    before = after = 0
+    for idx in range(len(content.storeContent)):
+        for screenshot in content.getInfo(idx).get("screenshots", []):
+            source = variants.source(screenshot.get("url") if isinstance(screenshot, dict) else None, content.storeInfo)
+            if source != None:
+                before += source.stat().st_size
+                after += variants.best(screenshot["url"], content.storeInfo, "web").stat().st_size
+    return before, after
+
+def format_saving(before: int, after: int) -> str:
+    percent = (before - after) / before * 100 if before else 0
+    return f"{before / 1024:.0f} KiB -> {after / 1024:.0f} KiB ({before - after:,} bytes, {percent:.0f}% saved)"
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Encode smaller PNG/WebP variants of assets/screenshots and point the unistore at them")
+    arg_parser.add_argument("unistore", type=Path, nargs="?", default=UNISTORE_FILENAME, help="Unistore whose screenshot URLs are rewritten")
+    arg_parser.add_argument("-w", "--write", action="store_true", help="Save the rewritten screenshot URLs, otherwise only report")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    args = arg_parser.parse_args()
+
+    variants = build(args.jobs)
+    content = StoreContent(args.unistore)
+    print(f"Unistore: {format_saving(*rewrite_unistore(content, variants, args.write))}")
+    print(f"Site: {format_saving(*web_savings(content, variants))}")
+    if args.write and content.save():
+        print(f"Saved {args.unistore.name}")
+    # Only once the URLs point at the current variants
+    remove_stale(variants, referenced_paths(content))
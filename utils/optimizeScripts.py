@@ -0,0 +1,176 @@
+import os, sys, time, argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import UNISTORE_FILENAME, StoreContent
+
+# What the simulation knows about a path on the SD card. Anything the script
+# didn't touch yet may or may not be there from an earlier install
+EXISTS, ABSENT, UNKNOWN = "exists", "absent", "unknown"
+
+# Steps that read a path, by block type and field
+READ_FIELDS = {"extractFile": ("file",), "installCia": ("file",), "move": ("old",), "copy": ("source",)}
+# Steps that write a whole file at a path
+WRITE_FIELDS = {"downloadFile": "output", "downloadRelease": "output"}
+
+def normalize(path) -> str:
+    # FAT is case insensitive, directories are kept without their trailing /
+    return path.strip().rstrip("/").casefold() if isinstance(path, str) else ""
+
+def is_under(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory + "/")
+
+class VirtualSD:
+    # Every change is recorded on the path it was made to, the newest change
+    # on a path or on one of its parent directories decides its state. Only
+    # a removed parent says something about what is inside it, one that was
+    # created, copied or extracted to leaves it unknown. A newer write
+    # inside a directory brings that directory back
+    def __init__(self):
+        self.changes: dict[str, tuple[int, str]] = {}
+        self.seq = 0
+
+    def state(self, path: str) -> str:
+        best = (-1, UNKNOWN)
+        parts = path.split("/")
+        for i in range(len(parts), 0, -1):
+            change = self.changes.get("/".join(parts[:i]))
+            if change != None and change[0] > best[0]:
+                best = change if i == len(parts) or change[1] == ABSENT else (change[0], UNKNOWN)
+        seq, state = best
+        prefix = path + "/"
+        for changed, (change_seq, change_state) in self.changes.items():
+            if change_seq > seq and change_state != ABSENT and changed.startswith(prefix):
+                if change_state == EXISTS:
+                    return EXISTS
+                if state == ABSENT:
+                    state = UNKNOWN
+        return state
+
+    def set(self, path: str, state: str, conditional: bool):
+        # A step that might not run leaves either the old or the new state
+        if conditional and self.state(path) != state:
+            state = UNKNOWN
+        self.seq += 1
+        self.changes[path] = (self.seq, state)
+
+def conditional_steps(blocks: list) -> list[bool]:
+    # Steps a promptMessage can skip or a skip jumps over don't always run
+    conditional = [False] * len(blocks)
+    for i, block in enumerate(blocks):
+        if block.get("type") in ("promptMessage", "skip"):
+            count = block.get("count", 0)
+            if isinstance(count, int):
+                for j in range(i + 1, min(i + 1 + count, len(blocks))):
+                    conditional[j] = True
+    return conditional
+
+def redundant_steps(blocks: list) -> dict[int, str]:
+    # Step index -> why it can go
+    conditional = conditional_steps(blocks)
+    sd = VirtualSD()
+    redundant = {}
+    # Path -> index of the download that last wrote it and nobody read yet
+    unread_writes: dict[str, int] = {}
+
+    for i, block in enumerate(blocks):
+        block_type = block.get("type")
+        cond = conditional[i]
+
+        for field in READ_FIELDS.get(block_type, ()):
+            path = normalize(block.get(field))
+            for written in [written for written in unread_writes if is_under(written, path)]:
+                del unread_writes[written]
+
+        if block_type in WRITE_FIELDS:
+            path = normalize(block.get(WRITE_FIELDS[block_type]))
+            if not cond and path in unread_writes:
+                redundant[unread_writes[path]] = f"overwritten by step {i} before it's used"
+            unread_writes[path] = i
+            sd.set(path, EXISTS, cond)
+        elif block_type == "deleteFile":
+            path = normalize(block.get("file"))
+            if sd.state(path) == ABSENT:
+                redundant[i] = "file is already gone"
+                continue
+            if not cond and path in unread_writes:
+                redundant[unread_writes.pop(path)] = f"deleted by step {i} before it's used"
+            sd.set(path, ABSENT, cond)
+        elif block_type == "rmdir":
+            path = normalize(block.get("directory"))
+            if sd.state(path) == ABSENT and not block.get("required", False):
+                redundant[i] = "directory is already gone"
+                continue
+            if not cond:
+                for written in [written for written in unread_writes if is_under(written, path)]:
+                    redundant[unread_writes.pop(written)] = f"removed by step {i} before it's used"
+            sd.set(path, ABSENT, cond)
+        elif block_type == "mkdir":
+            path = normalize(block.get("directory"))
+            if sd.state(path) == EXISTS:
+                redundant[i] = "directory already exists"
+                continue
+            sd.set(path, EXISTS, cond)
+        elif block_type == "extractFile":
+            # Which files come out of the archive isn't known
+            sd.set(normalize(block.get("output")), UNKNOWN, cond)
+        elif block_type == "move":
+            old = normalize(block.get("old"))
+            sd.set(normalize(block.get("new")), EXISTS if sd.state(old) == EXISTS else UNKNOWN, cond)
+            sd.set(old, ABSENT, cond)
+        elif block_type == "copy":
+            source = normalize(block.get("source"))
+            sd.set(normalize(block.get("destination")), EXISTS if sd.state(source) == EXISTS else UNKNOWN, cond)
+        elif block_type == "exit" and not cond:
+            break
+    return redundant
+
+def remove_steps(blocks: list, indexes) -> int:
+    # promptMessage/skip counts spanning a removed step shrink with it
+    removed = 0
+    for i in sorted(indexes, reverse=True):
+        for j in range(i):
+            block = blocks[j]
+            if block.get("type") in ("promptMessage", "skip") and isinstance(block.get("count"), int) and j < i <= j + block["count"]:
+                block["count"] -= 1
+        del blocks[i]
+        removed += 1
+    return removed
+
+def optimize_store(content: StoreContent, write: bool = False, verbose: bool = False) -> tuple[int, int]:
+    before = after = 0
+    for idx in range(len(content.storeContent)):
+        entry = content.getEntry(idx)
+        changed = False
+        for name, blocks in entry.items():
+            if name == "info" or not isinstance(blocks, list):
+                continue
+            redundant = redundant_steps(blocks)
+            before += len(blocks)
+            after += len(blocks) - len(redundant)
+            if redundant:
+                print(f"{entry['info']['title']} / {name}: {len(blocks)} -> {len(blocks) - len(redundant)} steps")
+                if verbose:
+                    for i, reason in sorted(redundant.items()):
+                        print(f"    step {i} ({blocks[i].get('type')}): {reason}")
+                if write:
+                    remove_steps(blocks, redundant)
+                    changed = True
+        if changed:
+            content.markDirty(idx)
+    return before, after
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Find and drop install script steps that can't change the result on the SD card")
+    arg_parser.add_argument("unistore", type=Path, nargs="?", default=UNISTORE_FILENAME, help="Unistore to optimize")
+    arg_parser.add_argument("-w", "--write", action="store_true", help="Save the optimized scripts, otherwise only report")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="List every redundant step and why")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    content = StoreContent(args.unistore)
+    before, after = optimize_store(content, args.write, args.verbose)
+    elapsed = time.perf_counter() - start
+    if args.write and content.save():
+        print(f"Saved {args.unistore.name}")
+    print(f"{before} -> {after} steps over {len(content.storeContent)} entries ({elapsed * 1000:.1f} ms)")
@@ -0,0 +1,168 @@
+import os, sys, json, gzip, time, argparse
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import UNISTORE_FILENAME, SPRITESHEET_FILENAME, writeFileAtomic, readSpritesheet
+from store_model import BLOCK_SCHEMA, INFO_SCHEMA
+from validateUnistore import STORE_INFO_KEYS, validate
+
+SCREENSHOT_KEYS = ("description", "url")
+# Keys Universal Updater is known not to read, named like in the dropped
+# report (<record>.<key>). Only these and false booleans, which are its
+# default, may be left out of the published file. Any other key is kept
+IGNORED_KEYS: frozenset[str] = frozenset()
+
+def is_default(key: str, value, bools: tuple, prefix: str) -> bool:
+    return (key in bools and value is False) or f"{prefix}{key}" in IGNORED_KEYS
+
+def normalize_record(record: dict, keys, bools: tuple = (), dropped: Counter | None = None, prefix: str = "") -> dict:
+    # Known keys in schema order, then the unknown ones in their order.
+    # Defaults are left out and counted in dropped
+    normalized = {}
+    for key in tuple(key for key in keys if key in record) + tuple(key for key in record if not key in keys):
+        if not is_default(key, record[key], bools, prefix):
+            normalized[key] = record[key]
+    if dropped != None:
+        dropped.update(f"{prefix}{key}" for key in record if not key in normalized)
+    return normalized
+
+INFO_KEYS = tuple(field.name for field in INFO_SCHEMA)
+BLOCK_KEYS = {block_type: ("type",) + tuple(field.name for field in fields) for block_type, fields in BLOCK_SCHEMA.items()}
+BLOCK_BOOLS = {block_type: tuple(field.name for field in fields if field.kind == "bool") for block_type, fields in BLOCK_SCHEMA.items()}
+
+def normalize_block(block, dropped: Counter | None = None):
+    block_type = block.get("type") if isinstance(block, dict) else None
+    if not block_type in BLOCK_KEYS:
+        # Nothing is known about it, kept as it is
+        return block
+    return normalize_record(block, BLOCK_KEYS[block_type], BLOCK_BOOLS[block_type], dropped, f"{block_type}.")
+
+def normalize_entry(entry: dict, dropped: Counter | None = None) -> dict:
+    # info first, the scripts keep their order since it's the order shown
+    info = normalize_record(entry["info"], INFO_KEYS, (), dropped, "info.")
+    if isinstance(info.get("screenshots"), list):
+        info["screenshots"] = [normalize_record(screenshot, SCREENSHOT_KEYS, (), dropped, "screenshot.") if isinstance(screenshot, dict) else screenshot
+                               for screenshot in info["screenshots"]]
+    normalized = {"info": info}
+    for name, blocks in entry.items():
+        if name != "info":
+            normalized[name] = [normalize_block(block, dropped) for block in blocks] if isinstance(blocks, list) else blocks
+    return normalized
+
+def normalize_store(store: dict, dropped: Counter | None = None) -> dict:
+    normalized = {
+        "storeInfo": normalize_record(store["storeInfo"], STORE_INFO_KEYS, (), dropped, "storeInfo."),
+        "storeContent": [normalize_entry(entry, dropped) for entry in store["storeContent"]],
+    }
+    normalized.update((key, value) for key, value in store.items() if not key in normalized)
+    return normalized
+
+def dump_compact(store: dict) -> str:
+    return json.dumps(store, separators=(",", ":"), ensure_ascii=False)
+
+def differences(source, published, where: str, bools: tuple = (), prefix: str = "") -> list[str]:
+    # Where the published value doesn't read like the source one. A record
+    # may leave out its defaults, given by bools and prefix
+    if isinstance(source, dict) and isinstance(published, dict):
+        found = [f"{where}: {key} not in the source" for key in published if not key in source]
+        for key, value in source.items():
+            if key in published:
+                found += differences(value, published[key], f"{where}.{key}")
+            elif not is_default(key, value, bools, prefix):
+                found.append(f"{where}: {prefix}{key} was dropped")
+        return found
+    if isinstance(source, list) and isinstance(published, list) and len(source) == len(published):
+        return [found for i, (value, other) in enumerate(zip(source, published)) for found in differences(value, other, f"{where}[{i}]")]
+    return [] if type(source) == type(published) and source == published else [f"{where}: differs"]
+
+def entry_differences(entry, published, where: str) -> list[str]:
+    if not isinstance(entry, dict) or not isinstance(published, dict) or not isinstance(entry.get("info"), dict):
+        return differences(entry, published, where)
+    # Scripts are shown in their order
+    if [key for key in entry if key != "info"] != [key for key in published if key != "info"]:
+        return [f"{where}: the scripts differ or are in another order"]
+    info, published_info = dict(entry["info"]), published.get("info")
+    screenshots = info.pop("screenshots", None)
+    if not isinstance(published_info, dict):
+        return [f"{where}.info: differs"]
+    published_info = dict(published_info)
+    published_screenshots = published_info.pop("screenshots", None)
+    found = differences(info, published_info, f"{where}.info", (), "info.")
+    if isinstance(screenshots, list) and isinstance(published_screenshots, list) and len(screenshots) == len(published_screenshots):
+        for i, (screenshot, other) in enumerate(zip(screenshots, published_screenshots)):
+            found += differences(screenshot, other, f"{where}.info.screenshots[{i}]", (), "screenshot.")
+    elif screenshots != None or published_screenshots != None:
+        found += differences(screenshots, published_screenshots, f"{where}.info.screenshots")
+    for name, blocks in entry.items():
+        if name == "info":
+            continue
+        if not isinstance(blocks, list) or not isinstance(published[name], list) or len(blocks) != len(published[name]):
+            found += differences(blocks, published[name], f"{where} '{name}'")
+            continue
+        for i, (block, other) in enumerate(zip(blocks, published[name])):
+            block_type = block.get("type") if isinstance(block, dict) else None
+            found += differences(block, other, f"{where} '{name}' block {i}", BLOCK_BOOLS.get(block_type, ()), f"{block_type}.")
+    return found
+
+def check_round_trip(source_text: str, published_text: str) -> list[str]:
+    # What Universal Updater reads from the published file, compared with
+    # the raw source rather than with its normalization. Empty when they
+    # read the same
+    source, published = json.loads(source_text), json.loads(published_text)
+    if not isinstance(published, dict) or set(source) != set(published):
+        return ["the top-level keys differ"]
+    found = differences(source["storeInfo"], published["storeInfo"], "storeInfo", (), "storeInfo.")
+    for key in source:
+        if not key in ("storeInfo", "storeContent"):
+            found += differences(source[key], published[key], key)
+    entries = published["storeContent"]
+    if not isinstance(entries, list) or len(entries) != len(source["storeContent"]):
+        return found + ["storeContent: not the same number of entries"]
+    for idx, (entry, other) in enumerate(zip(source["storeContent"], entries)):
+        found += entry_differences(entry, other, f"entry {idx}")
+    return found
+
+def sizes(text: str) -> tuple[int, int]:
+    data = text.encode("utf-8")
+    return len(data), len(gzip.compress(data, 9))
+
+def publish(source: Path, output: Path, icon_count: int | None = None) -> int:
+    start = time.perf_counter()
+    # A file the client can't install from isn't published, whatever the format
+    errors = [message for level, message in validate(source, icon_count) if level == "error"]
+    if errors:
+        for message in errors:
+            print(f"error: {message}", file=sys.stderr)
+        print(f"{source.name} has {len(errors)} errors, nothing written", file=sys.stderr)
+        return 1
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        source_text = f.read()
+    dropped = Counter()
+    published_text = dump_compact(normalize_store(json.loads(source_text), dropped))
+
+    found = check_round_trip(source_text, published_text)
+    if found:
+        for difference in found:
+            print(f"error: {difference}", file=sys.stderr)
+        print(f"{output.name} would not read the same as {source.name}, nothing written", file=sys.stderr)
+        return 1
+    writeFileAtomic(output, published_text)
+
+    for key, count in sorted(dropped.items()):
+        print(f"Dropped {key} x{count}")
+    (raw_before, gzip_before), (raw_after, gzip_after) = sizes(source_text), sizes(published_text)
+    print(f"{source.name}: {raw_before:,} bytes, {gzip_before:,} gzipped")
+    print(f"{output.name}: {raw_after:,} bytes ({raw_after / raw_before:.0%}), {gzip_after:,} gzipped ({gzip_after / gzip_before:.0%})")
+    print(f"Round trip ok in {time.perf_counter() - start:.3f} s")
+    return 0
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Write a minified copy of the unistore for publishing and check it reads the same")
+    arg_parser.add_argument("unistore", type=Path, nargs="?", default=UNISTORE_FILENAME, help="Editable unistore")
+    arg_parser.add_argument("-o", "--output", type=Path, help="Published file (default: <name>.min.unistore next to the source)")
+    arg_parser.add_argument("--t3s", type=Path, default=SPRITESHEET_FILENAME, help="Spritesheet description the icon indexes are checked against")
+    arg_parser.add_argument("--no-icons", action="store_true", help="Skip the icon/sheet index checks")
+    args = arg_parser.parse_args()
+    icon_count = None if args.no_icons else len(readSpritesheet(args.t3s))
+    sys.exit(publish(args.unistore, args.output if args.output != None else args.unistore.with_suffix(".min.unistore"), icon_count))
@@ -0,0 +1,217 @@
+import os, sys, json, time, argparse
+from bisect import bisect_right
+from operator import itemgetter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(os.path.realpath(__file__)).parent.parent))
+from store_core import ROOT_DIR, SPRITESHEET_FILENAME, JSON_DECODER, scanStore, skipWhitespace, decodeKey, skipSeparator, readSpritesheet, checkSpriteIndexes
+from store_dates import parseTimestamp
+from store_model import BLOCK_SCHEMA, INFO_SCHEMA
+
+STORE_INFO_KEYS = {"title": str, "author": str, "description": str, "file": str, "url": str, "sheet": (str, list), "sheetURL": (str, list), "version": int, "revision": int}
+KIND_TYPES = {"string": str, "bool": bool, "count": int, "list": list}
+KIND_NAMES = {"string": "a string", "bool": "true or false", "count": "a number", "list": "a list"}
+MISSING = object()
+
+def compile_fields(fields) -> tuple:
+    # Exact type checks, JSON only ever gives back these types and it keeps
+    # true/false from passing as numbers
+    return tuple((field.name, KIND_TYPES[field.kind], field.optional, field.kind) for field in fields)
+
+INFO_SPEC = compile_fields(INFO_SCHEMA)
+BLOCK_SPECS = {block_type: compile_fields(fields) for block_type, fields in BLOCK_SCHEMA.items()}
+
+def compile_fast_check(fields) -> tuple:
+    # Blocks holding exactly their required fields with the right types are
+    # checked with one itemgetter call, anything else goes through check_fields
+    required = [field for field in fields if not field.optional]
+    types = tuple(KIND_TYPES[field.kind] for field in required)
+    if len(required) > 1:
+        getter = itemgetter(*(field.name for field in required))
+    elif len(required) == 1:
+        getter = lambda block, name=required[0].name : (block[name],)
+    else:
+        getter = lambda block : ()
+    return getter, types, len(required) + 1
+
+BLOCK_FAST_CHECKS = {block_type: compile_fast_check(fields) for block_type, fields in BLOCK_SCHEMA.items()}
+
+# (block type, keys, value types) of records that already passed, records
+# with a known good shape are skipped
+valid_shapes = set()
+
+def record_shape(record: dict, record_type: str | None = None) -> tuple:
+    return (record_type, tuple(record), tuple(map(type, record.values())))
+
+def check_fields(record: dict, spec: tuple, record_type: str | None = None) -> list[tuple[str, str]] | None:
+    # None when everything is fine, most records are
+    shape = record_shape(record, record_type)
+    if shape in valid_shapes:
+        return None
+    problems = None
+    for name, expected, optional, kind in spec:
+        value = record.get(name, MISSING)
+        if type(value) is expected or (value is MISSING and optional):
+            continue
+        if problems == None:
+            problems = []
+        if value is MISSING:
+            if kind == "bool":
+                problems.append(("warning", f"missing '{name}' (defaults to false)"))
+            else:
+                problems.append(("error", f"missing '{name}'"))
+        else:
+            problems.append(("error", f"'{name}' should be {KIND_NAMES[kind]}, got {value!r}"))
+    if problems == None:
+        valid_shapes.add(shape)
+    return problems
+
+class EntryDict(dict):
+    # Earlier members that a repeated key replaced, they still get checked
+    def __init__(self):
+        super().__init__()
+        self.duplicates: list[tuple[str, object]] = []
+
+def decode_entry(text: str, pos: int) -> tuple[dict, int]:
+    # Decodes an entry one member at a time, json would silently keep only
+    # the last of two scripts with the same name
+    if text[pos:pos + 1] != "{":
+        return JSON_DECODER.raw_decode(text, pos)
+    entry = EntryDict()
+    pos = skipWhitespace(text, pos + 1)
+    while text[pos] != "}":
+        key, pos = decodeKey(text, pos)
+        value, pos = JSON_DECODER.raw_decode(text, pos)
+        if key in entry:
+            entry.duplicates.append((key, entry[key]))
+        entry[key] = value
+        pos = skipSeparator(text, pos, "}")
+    return entry, pos + 1
+
+def check_store_info(store_info, problems: list):
+    if not isinstance(store_info, dict):
+        problems.append(("error", "storeInfo: missing or not an object"))
+        return
+    for key, types in STORE_INFO_KEYS.items():
+        if not key in store_info:
+            problems.append(("error", f"storeInfo: missing '{key}'"))
+        elif not isinstance(store_info[key], types) or isinstance(store_info[key], bool):
+            problems.append(("error", f"storeInfo: '{key}' has the wrong type ({type(store_info[key]).__name__})"))
+
+def check_entry(entry, store_info: dict, icon_count: int | None, problems: list):
+    if not isinstance(entry, dict) or not isinstance(entry.get("info"), dict):
+        problems.append(("error", "entry has no 'info' object"))
+        return
+    info = entry["info"]
+    found = check_fields(info, INFO_SPEC)
+    if found:
+        problems += [(level, f"info: {message}") for level, message in found]
+
+    last_updated = info.get("last_updated")
+    if isinstance(last_updated, str):
+        try:
+            parseTimestamp(last_updated)
+        except ValueError as e:
+            problems.append(("error", f"info: last_updated: {e}"))
+    if icon_count != None:
+        for error in checkSpriteIndexes(store_info, [info], icon_count):
+            problems.append(("error", f"info: {error.split(': ', 1)[-1]}"))
+
+    scripts = list(entry.items())
+    if isinstance(entry, EntryDict) and entry.duplicates:
+        problems.append(("error", f"duplicate script names {', '.join(sorted(set(key for key, _ in entry.duplicates)))}"))
+        scripts = entry.duplicates + scripts
+    for name, blocks in scripts:
+        if name == "info":
+            continue
+        if not isinstance(blocks, list):
+            problems.append(("error", f"script '{name}' is not a list of blocks"))
+            continue
+        for i, block in enumerate(blocks):
+            try:
+                getter, types, length = BLOCK_FAST_CHECKS[block["type"]]
+                if len(block) == length and tuple(map(type, getter(block))) == types:
+                    continue
+            except (KeyError, TypeError):
+                pass
+            if not isinstance(block, dict):
+                problems.append(("error", f"script '{name}' block {i}: not an object"))
+                continue
+            block_type = block.get("type")
+            spec = BLOCK_SPECS.get(block_type)
+            if spec == None:
+                problems.append(("error", f"script '{name}' block {i}: unknown block type {block_type!r}"))
+                continue
+            found = check_fields(block, spec, block_type)
+            if found:
+                problems += [(level, f"script '{name}' block {i} ({block_type}): {message}") for level, message in found]
+
+class LineIndex:
+    def __init__(self, text: str):
+        self.text = text
+        self.newlines = None
+
+    def line(self, pos: int) -> int:
+        # Only built once something has to be reported
+        if self.newlines == None:
+            self.newlines = []
+            pos_nl = self.text.find("\n")
+            while pos_nl != -1:
+                self.newlines.append(pos_nl)
+                pos_nl = self.text.find("\n", pos_nl + 1)
+        return bisect_right(self.newlines, pos) + 1
+
+def validate(path: Path, icon_count: int | None) -> list[tuple[str, str]]:
+    # Returns (level, message) pairs, messages start with path:line
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    try:
+        content, info_span, entry_spans = scanStore(text, decode_entry)
+    except (ValueError, IndexError) as e:
+        return [("error", f"{path}: not a valid unistore file ({e})")]
+
+    lines = LineIndex(text)
+    results = []
+    problems = []
+    check_store_info(content.get("storeInfo"), problems)
+    line = lines.line(info_span[0]) if problems and info_span != None else 1
+    results += [(level, f"{path}:{line}: {message}") for level, message in problems]
+
+    store_info = content.get("storeInfo") if isinstance(content.get("storeInfo"), dict) else {}
+    entries = content.get("storeContent")
+    if not isinstance(entries, list):
+        results.append(("error", f"{path}: missing or invalid 'storeContent'"))
+        return results
+    for idx, entry in enumerate(entries):
+        problems = []
+        check_entry(entry, store_info, icon_count, problems)
+        if problems:
+            line = lines.line(entry_spans[idx][0]) if entry_spans != None else 1
+            title = entry["info"].get("title") if isinstance(entry, dict) and isinstance(entry.get("info"), dict) else None
+            prefix = f"{path}:{line}: entry {idx}" + (f" ({title})" if title != None else "")
+            results += [(level, f"{prefix}: {message}") for level, message in problems]
+    return results
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Check .unistore files before publishing them")
+    arg_parser.add_argument("files", type=Path, nargs="*", default=[ROOT_DIR.joinpath("stb-mc3ds.unistore")], help="Unistore files to check")
+    arg_parser.add_argument("--t3s", type=Path, default=SPRITESHEET_FILENAME, help="Spritesheet description the icon indexes are checked against")
+    arg_parser.add_argument("--no-icons", action="store_true", help="Skip the icon/sheet index checks")
+    arg_parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    arg_parser.add_argument("-q", "--quiet", action="store_true", help="Only print errors")
+    args = arg_parser.parse_args()
+
+    icon_count = None if args.no_icons else len(readSpritesheet(args.t3s))
+    failed = False
+    for path in args.files:
+        start = time.perf_counter()
+        results = validate(path, icon_count)
+        errors = sum(1 for level, _ in results if level == "error")
+        warnings = len(results) - errors
+        for level, message in results:
+            if level == "error" or not args.quiet:
+                print(f"{level}: {message}", file=sys.stderr)
+        if not args.quiet:
+            print(f"{path.name}: {errors} errors, {warnings} warnings ({time.perf_counter() - start:.3f} s)")
+        failed = failed or errors > 0 or (args.strict and warnings > 0)
+    sys.exit(1 if failed else 0)